@@ -1,6 +1,10 @@
 """Flask app factory and initialization"""
 import os
+import sqlite3
+import click
 from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
@@ -13,8 +17,16 @@ db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
 
-def create_app(config_name='development'):
-    """Create and configure the Flask application"""
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite only honours ON DELETE CASCADE when foreign keys are switched on per connection"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+def create_app(config_name='development', test_config=None):
+    """Create and configure the Flask application (test_config overrides settings, e.g. the database)"""
     import os
     
     # Get the parent directory (project root)
@@ -30,6 +42,8 @@ def create_app(config_name='development'):
     app.config['SECRET_KEY'] = "123123"
     app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite:////Users/tanishamaheshwari/VC_update/VC-Manager/instance/app.db"
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if test_config:
+        app.config.update(test_config)
     
     # Initialize extensions with app
     db.init_app(app)
@@ -37,6 +51,10 @@ def create_app(config_name='development'):
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
+
+    # Per-request query count / DB time headers and log (app/sql_metrics.py)
+    from app.sql_metrics import init_sql_metrics
+    init_sql_metrics(app)
     
     # User loader for Flask-Login
     @login_manager.user_loader
@@ -48,7 +66,8 @@ def create_app(config_name='development'):
     with app.app_context():
         from app.models import (
             User, PaymentStatus, Person, VC, VCHand, HandDistribution,
-            Contribution, Payment, LedgerEntry
+            Contribution, Payment, LedgerEntry, PersonBalance, LedgerCheckpoint,
+            ExportJob
         )
     
     # Register blueprints
@@ -114,3 +133,110 @@ def register_shell_commands(app):
         db.session.commit()
         print('Sample persons created.')
         print('Database initialized!')
+
+    @app.cli.command()
+    def sync_balances():
+        """Rebuild the person_balances table from ledger_entries"""
+        from app.models.person_balance import rebuild_person_balances
+        rebuild_person_balances()
+        db.session.commit()
+        print('Person balances rebuilt.')
+
+    @app.cli.command()
+    @click.option('--person', 'person_id', type=int, help='Rebalance one person')
+    @click.option('--vc', 'vc_id', type=int, help='Rebalance one VC (members, operator)')
+    @click.option('--user', 'user_id', type=int, help='Rebalance all persons and VCs of a user')
+    @click.option('--all', 'everyone', is_flag=True, help='Rebalance every ledger')
+    def rebalance(person_id, vc_id, user_id, everyone):
+        """Recompute running ledger balances inside the database"""
+        from app.rebalance import rebalance_scope
+        scopes = [s for s in (person_id, vc_id, user_id) if s is not None]
+        if len(scopes) + everyone != 1:
+            raise click.UsageError('Pass exactly one of --person, --vc, --user or --all.')
+        rows = rebalance_scope(person_id=person_id, vc_id=vc_id, user_id=user_id)
+        db.session.commit()
+        print(f'Rebalanced {rows} ledger rows.')
+
+    @app.cli.command()
+    @click.option('--person', 'person_id', type=int, help='Only this person')
+    def build_checkpoints(person_id):
+        """Extend month-end ledger checkpoints up to the current month"""
+        from app.models.ledger_checkpoint import build_checkpoints as extend_checkpoints
+        person_ids = [person_id] if person_id else [p.id for p in Person.query.all()]
+        added = sum(extend_checkpoints(pid) for pid in person_ids)
+        db.session.commit()
+        print(f'Added {added} checkpoints for {len(person_ids)} persons.')
+
+    @app.cli.command()
+    def rebuild_search_index():
+        """Create (if missing) and repopulate the SQLite FTS5 person search index"""
+        from app.search import rebuild_search_index as rebuild_fts
+        if db.engine.dialect.name != 'sqlite':
+            raise click.ClickException('The FTS5 search index is SQLite only; other databases use ILIKE.')
+        rebuild_fts()
+        db.session.commit()
+        print('Search index rebuilt.')
+
+    @app.cli.command()
+    @click.option('--processes', type=int, default=None, help='Worker processes (default: CPU count)')
+    @click.option('--once', is_flag=True, help='Exit when the queue is empty')
+    def export_worker(processes, once):
+        """Render queued ledger PDF/image exports in a process pool"""
+        from app.export_jobs import run_worker
+        print('Export worker started.')
+        run_worker(processes=processes, once=once)
+
+    @app.cli.command()
+    @click.option('--user', 'user_id', type=int, required=True, help='Owner of the persons')
+    @click.option('--period', default='', help='FROM:TO as YYYY-MM-DD:YYYY-MM-DD (either side may be empty)')
+    @click.option('--output', type=click.Path(dir_okay=False), default=None, help='ZIP file to write')
+    @click.option('--processes', type=int, default=None, help='Worker processes (default: CPU count)')
+    def export_statements(user_id, period, output, processes):
+        """Render every person's ledger PDF for a period into one ZIP"""
+        from app.statements import iter_statements, stream_zip, statement_person_ids, parse_period
+        try:
+            from_date, to_date = parse_period(period)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--period')
+
+        person_ids = statement_person_ids(user_id)
+        if not person_ids:
+            raise click.ClickException(f'User {user_id} has no persons.')
+
+        output = output or f"statements_{user_id}_{from_date or 'start'}_to_{to_date or 'today'}.zip"
+        with open(output, 'wb') as fh:
+            for chunk in stream_zip(iter_statements(person_ids, from_date, to_date, processes)):
+                fh.write(chunk)
+        print(f'Wrote {len(person_ids)} statements to {output}.')
+
+    @app.cli.command()
+    @click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+    @click.option('--user', 'user_id', type=int, required=True, help='Owner of the VCs and their members')
+    def create_vcs_from_csv(csv_file, user_id):
+        """Create VCs, their members and hand schedules from a CSV file"""
+        from app.vc_import import parse_vc_csv, create_vcs
+        try:
+            specs = parse_vc_csv(csv_file, user_id)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        if not specs:
+            raise click.ClickException('The CSV has no VC rows.')
+
+        vcs = create_vcs(user_id, specs)
+        db.session.commit()
+        hands = sum(vc.tenure for vc in vcs)
+        print(f'Created {len(vcs)} VCs (VC {vcs[0].vc_number}–{vcs[-1].vc_number}) with {hands} hands.')
+
+    @app.cli.command()
+    def check_query_plans():
+        """Fail if any ledger hot-path query needs a full table scan"""
+        from app.query_plans import check_query_plans as explain_hot_queries
+        failures = 0
+        for name, lines, full_scan in explain_hot_queries(db.session.connection()):
+            print(f"{'FULL SCAN' if full_scan else 'ok':9}  {name}")
+            for line in lines:
+                print(f'           {line}')
+            failures += full_scan
+        db.session.rollback()
+        if failures:
+            raise click.ClickException(f'{failures} hot query plan(s) fall back to a full scan.')
@@ -0,0 +1,87 @@
+"""Dashboard summary: everything the landing page shows, in a fixed number of queries.
+
+The dashboard used to walk VCs -> hands -> contributions in Python and run
+one Contribution query per hand of every pending VC, so its query count
+grew with the size of the operator's book.  dashboard_summary() gets the
+same numbers from a handful of grouped queries, however many VCs, hands
+or contributions there are.
+"""
+from sqlalchemy import func, select, or_, exists
+from app import db
+from app.models.vc import VC, VCHand, vc_members
+from app.models.person import Person
+from app.models.contribution import Contribution
+from app.models.enums import PaymentStatus
+from app.load_profiles import load_profile
+
+
+def unpaid_due_by_vc(vc_ids):
+    """{vc_id: sum of unpaid contributions} for the given VCs (VCs with nothing due are absent)."""
+    if not vc_ids:
+        return {}
+    rows = db.session.execute(
+        select(VCHand.vc_id, func.sum(Contribution.amount))
+        .join(Contribution, Contribution.hand_id == VCHand.id)
+        .where(
+            VCHand.vc_id.in_(vc_ids),
+            or_(Contribution.paid.is_(False), Contribution.paid.is_(None))
+        )
+        .group_by(VCHand.vc_id)
+    ).all()
+    return {vc_id: float(total or 0) for vc_id, total in rows}
+
+
+def hands_with_unpaid(vc_ids):
+    """Hands of the given VCs that still have an unpaid contribution, by id."""
+    if not vc_ids:
+        return []
+    unpaid = exists().where(
+        Contribution.hand_id == VCHand.id,
+        Contribution.paid.is_(False)
+    )
+    return VCHand.query.filter(VCHand.vc_id.in_(vc_ids), unpaid).order_by(VCHand.id).all()
+
+
+def pending_vc_members(user_id, vc_ids):
+    """The user's persons who are members of any of the given VCs."""
+    if not vc_ids:
+        return []
+    member_ids = select(vc_members.c.person_id).where(vc_members.c.vc_id.in_(vc_ids))
+    return (
+        Person.query
+        .filter(Person.user_id == user_id, Person.id.in_(member_ids))
+        .order_by(Person.name)
+        .all()
+    )
+
+
+def dashboard_summary(user_id):
+    """
+    Dict with the user's VCs and persons, total due (overall and per VC),
+    the pending VCs, their hands with unpaid contributions and members.
+    """
+    vcs = (
+        VC.query.options(*load_profile('dashboard'))
+        .filter_by(user_id=user_id)
+        .order_by(VC.vc_number)
+        .all()
+    )
+    persons = Person.query.filter_by(user_id=user_id).all()
+
+    due_by_vc = unpaid_due_by_vc([vc.id for vc in vcs])
+
+    # Same rule as `VC.status != PAID` in SQL: a NULL status is not pending
+    pending_vcs = [vc for vc in vcs if vc.status is not None and vc.status != PaymentStatus.PAID]
+    pending_ids = [vc.id for vc in pending_vcs]
+
+    return {
+        'vcs': vcs,
+        'persons': persons,
+        'total_vcs': len(vcs),
+        'total_persons': len(persons),
+        'due_by_vc': due_by_vc,
+        'total_due': sum(due_by_vc.values()),
+        'pending_vcs': pending_vcs,
+        'hands_with_unpaid': hands_with_unpaid(pending_ids),
+        'members': pending_vc_members(user_id, pending_ids),
+    }
@@ -0,0 +1,140 @@
+"""On-disk cache for rendered ledger exports (PDF / JPEG).
+
+Files are content-addressed: the name is a hash of everything the render
+depends on — person, filters, the person's ledger version and latest entry
+id from person_balances, and the template source.  Any ledger change bumps
+the version, so stale files are never served; they simply stop being
+requested and age out.
+
+The directory is bounded by EXPORT_CACHE_MAX_BYTES.  A hit refreshes the
+file's mtime and eviction removes the oldest files first (LRU).
+"""
+import hashlib
+import json
+import os
+import tempfile
+from flask import current_app
+from app import db
+from app.models.person_balance import PersonBalance
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_template_hashes = {}
+
+
+def _cache_dir():
+    path = current_app.config.get('EXPORT_CACHE_DIR') or os.path.join(
+        current_app.instance_path, 'export_cache'
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _template_hash(template_name):
+    """sha256 of a template's source, recomputed only when the file changes."""
+    source, filename, _ = current_app.jinja_env.loader.get_source(
+        current_app.jinja_env, template_name
+    )
+    mtime = os.path.getmtime(filename) if filename else None
+    cached = _template_hashes.get(template_name)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, hashlib.sha256(source.encode('utf-8')).hexdigest())
+        _template_hashes[template_name] = cached
+    return cached[1]
+
+
+def export_key(kind, person, filters, template_name='ledger/pdf_template.html'):
+    """Cache key for one export of a person's ledger."""
+    version, last_entry_id = db.session.query(
+        PersonBalance.version, PersonBalance.last_entry_id
+    ).filter(PersonBalance.person_id == person.id).first() or (0, None)
+
+    payload = json.dumps({
+        'kind': kind,
+        'person_id': person.id,
+        'name': person.name,
+        'opening_balance': float(person.opening_balance or 0),
+        'filters': filters,
+        'version': version,
+        'last_entry_id': last_entry_id,
+        'template': _template_hash(template_name),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _path_for(key, ext):
+    return os.path.join(_cache_dir(), key[:2], f'{key}.{ext}')
+
+
+def cached_export(key, ext):
+    """Path of a cached export, or None.  A hit counts as a use for LRU."""
+    path = _path_for(key, ext)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def store_export(key, ext, data):
+    """Write rendered bytes into the cache atomically and return the path."""
+    return store_export_chunks(key, ext, (data,))
+
+
+def store_export_chunks(key, ext, chunks):
+    """
+    Write an export that arrives in pieces (e.g. a streamed ZIP) into the
+    cache: chunks go to a temporary file that is renamed into place once
+    complete, so the whole export is never held in memory.
+    """
+    path = _path_for(key, ext)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    evict(keep=path)
+    return path
+
+
+def evict(keep=None):
+    """Delete least recently used files until the cache fits its size limit."""
+    limit = current_app.config.get('EXPORT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+
+    files, total = [], 0
+    for root, _, names in os.walk(_cache_dir()):
+        for name in names:
+            if name.endswith('.tmp'):
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+    if total <= limit:
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= limit:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
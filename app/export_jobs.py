@@ -0,0 +1,282 @@
+"""Background ledger exports.
+
+Web requests only insert an ExportJob row (enqueue_export) and poll it.
+`flask export-worker` claims queued rows and renders them in a pool of
+worker processes, each with its own app and database connection, writing
+progress back to the row and the result into the export cache.  The queue
+is the export_jobs table itself, so no broker is needed.
+
+Besides one person's PDF or JPEG, a job can be a 'statements' run: every
+person's statement for a period in one ZIP (the Persons page's "All
+Statements"), rendered in the worker rather than the web process.
+
+A claimed job records the claiming worker ('host:pid').  A job left
+'running' is put back in the queue once that worker process is gone, or
+once it has run for longer than EXPORT_JOB_TIMEOUT seconds.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, update, and_, or_
+from app import db
+from app.models.export_job import ExportJob
+from app.models.person import Person
+from app.export_cache import export_key, cached_export, store_export, store_export_chunks
+
+EXPORT_KINDS = {'pdf': 'pdf', 'jpeg': 'jpg'}   # kind -> file extension
+STATEMENTS_KIND = 'statements'                 # all of a user's statements, one ZIP
+
+DEFAULT_JOB_TIMEOUT = 30 * 60   # seconds a job may stay 'running'
+REQUEUE_INTERVAL = 60            # seconds between a worker's stale-job checks
+
+
+def enqueue_export(user_id, person, kind, filters):
+    """
+    Queue an export and return the job.  If the export is already in the
+    cache the job is created finished, pointing at the cached file.
+    """
+    job = ExportJob(
+        user_id=user_id,
+        person_id=person.id,
+        kind=kind,
+        params=json.dumps(filters, sort_keys=True),
+    )
+
+    path = cached_export(export_key(kind, person, filters), EXPORT_KINDS[kind])
+    if path is not None:
+        job.status = 'done'
+        job.progress = 100
+        job.result_path = path
+        job.finished_at = datetime.utcnow()
+
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def worker_id():
+    """Identifies this worker process on the export_jobs rows it claims."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _worker_is_dead(worker):
+    """True for a worker on this host whose process no longer exists."""
+    host, _, pid = (worker or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass
+    return False
+
+
+def enqueue_statements(user_id, filters):
+    """Queue every person's statement for a period (filters: from_date, to_date) as one ZIP."""
+    job = ExportJob(
+        user_id=user_id,
+        kind=STATEMENTS_KIND,
+        params=json.dumps(filters, sort_keys=True),
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def claim_next_job(worker=None):
+    """Atomically move the oldest queued job to 'running'; returns its id or None."""
+    t = ExportJob.__table__
+    while True:
+        job_id = db.session.execute(
+            select(t.c.id).where(t.c.status == 'queued').order_by(t.c.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            db.session.rollback()
+            return None
+
+        claimed = db.session.execute(
+            update(t)
+            .where(t.c.id == job_id, t.c.status == 'queued')
+            .values(status='running', progress=5, started_at=datetime.utcnow(), worker_id=worker)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+
+
+def requeue_stale_jobs(timeout=None, worker=None):
+    """
+    Put 'running' jobs back in the queue when their worker died: jobs
+    started more than `timeout` seconds ago (default EXPORT_JOB_TIMEOUT),
+    and jobs claimed by a worker process on this host that has exited.
+    Jobs live workers are rendering are left alone, and jobs claimed by
+    `worker` (the caller) are never requeued.
+    """
+    if timeout is None:
+        timeout = current_app.config.get('EXPORT_JOB_TIMEOUT', DEFAULT_JOB_TIMEOUT)
+    t = ExportJob.__table__
+
+    timed_out = t.c.started_at < datetime.utcnow() - timedelta(seconds=timeout)
+    if worker is not None:
+        timed_out = and_(timed_out, or_(t.c.worker_id.is_(None), t.c.worker_id != worker))
+    stale = [timed_out]
+
+    workers = db.session.execute(
+        select(t.c.worker_id).where(t.c.status == 'running').distinct()
+    ).scalars()
+    dead = [w for w in workers if _worker_is_dead(w)]
+    if dead:
+        stale.append(t.c.worker_id.in_(dead))
+
+    count = db.session.execute(
+        update(t)
+        .where(t.c.status == 'running', or_(*stale))
+        .values(status='queued', progress=0, started_at=None, worker_id=None)
+    ).rowcount
+    db.session.commit()
+    return count
+
+
+def _set_progress(job, progress):
+    job.progress = progress
+    db.session.commit()
+
+
+def _render_export(job):
+    """Path of one person's PDF/JPEG export, rendered unless already cached."""
+    from weasyprint import HTML
+    from app.routes.ledger import render_statement_html, pdf_to_jpeg
+
+    person = db.session.get(Person, job.person_id)
+    if person is None:
+        raise Exception('Person not found')
+    filters = job.filters
+    ext = EXPORT_KINDS[job.kind]
+
+    key = export_key(job.kind, person, filters)
+    path = cached_export(key, ext)
+    if path is None:
+        now = datetime.now() if job.kind == 'pdf' else None
+        rendered_html = render_statement_html(
+            person, filters.get('vc_id'), filters.get('from_date'), filters.get('to_date'), now
+        )
+        _set_progress(job, 30)
+
+        data = HTML(string=rendered_html).write_pdf()
+        _set_progress(job, 80)
+
+        if job.kind == 'jpeg':
+            data = pdf_to_jpeg(data)
+        path = store_export(key, ext, data)
+    return path
+
+
+def _render_statements(job):
+    """
+    Path of the ZIP of every person's statement.  The PDFs are rendered in
+    parallel by iter_statements() and streamed into the export cache.
+    """
+    from app.statements import iter_statements, statement_person_ids, stream_zip
+
+    filters = job.filters
+    person_ids = statement_person_ids(job.user_id)
+
+    def statements():
+        rendered = iter_statements(person_ids, filters.get('from_date'), filters.get('to_date'))
+        for done, statement in enumerate(rendered, start=1):
+            yield statement
+            _set_progress(job, 5 + 90 * done // len(person_ids))
+
+    key = hashlib.sha256(f'{STATEMENTS_KIND}:{job.id}'.encode('utf-8')).hexdigest()
+    return store_export_chunks(key, 'zip', stream_zip(statements()))
+
+
+def run_job(job_id):
+    """Render one claimed job.  Runs inside an app context."""
+    job = db.session.get(ExportJob, job_id)
+    if job is None:
+        return
+
+    try:
+        if job.kind == STATEMENTS_KIND:
+            path = _render_statements(job)
+        else:
+            path = _render_export(job)
+
+        job.result_path = path
+        job.status = 'done'
+        job.progress = 100
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(ExportJob, job_id)
+        job.status = 'failed'
+        job.error = str(e)
+
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+# ── Worker pool ──────────────────────────────────────────────────────────────
+
+_worker_app = None
+
+
+def _init_worker():
+    """Build one app per worker process; it is reused for every job it runs."""
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app()
+
+
+def _run_in_worker(job_id):
+    with _worker_app.app_context():
+        try:
+            run_job(job_id)
+        finally:
+            db.session.remove()
+
+
+def run_worker(processes=None, poll_interval=1.0, once=False):
+    """
+    Claim queued jobs and render them on `processes` worker processes
+    (default: one per CPU).  With once=True, return when the queue is empty.
+    """
+    processes = processes or os.cpu_count() or 1
+    worker = worker_id()
+    requeue_stale_jobs(worker=worker)
+    last_requeue = time.monotonic()
+
+    # spawn, not fork: workers must not share the parent's DB connections
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                             initializer=_init_worker) as pool:
+        running = set()
+        while True:
+            # Pick up jobs abandoned by workers that died since the last check
+            if time.monotonic() - last_requeue > REQUEUE_INTERVAL:
+                requeue_stale_jobs(worker=worker)
+                last_requeue = time.monotonic()
+
+            while len(running) < processes:
+                job_id = claim_next_job(worker)
+                if job_id is None:
+                    break
+                running.add(pool.submit(_run_in_worker, job_id))
+
+            if not running:
+                if once:
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            done, running = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
@@ -0,0 +1,57 @@
+"""Streaming CSV exports.
+
+Rows are read through a server-side cursor in batches and written out as
+they arrive, so a full-year export never holds the whole result set (or
+the whole file) in memory.
+"""
+import csv
+from io import StringIO
+from flask import Response, stream_with_context
+from app import db
+
+STREAM_BATCH_SIZE = 1000
+FLUSH_BYTES = 64 * 1024
+
+
+def stream_rows(statement):
+    """Yield result rows of a Core select, fetched STREAM_BATCH_SIZE at a time."""
+    result = db.session.execute(
+        statement,
+        execution_options={'stream_results': True, 'yield_per': STREAM_BATCH_SIZE}
+    )
+    for batch in result.partitions():
+        yield from batch
+
+
+def csv_response(filename, header, rows):
+    """
+    Stream `rows` (an iterable of sequences, typically built on stream_rows)
+    as a CSV attachment.  The iterable is consumed inside the request
+    context, after the response headers have been sent.
+    """
+    def generate():
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        buffer.write('\ufeff')  # BOM so Excel reads ₹ and Hindi narrations as UTF-8
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() >= FLUSH_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+def format_date(value):
+    return value.strftime('%Y-%m-%d %H:%M') if value else ''
+
+
+def format_amount(value):
+    return f'{float(value or 0):.2f}'
@@ -0,0 +1,41 @@
+"""Named eager-loading profiles for the VC model graph.
+
+Every relationship on VC, VCHand and HandDistribution is lazy, so a
+template that walks them (hand.total_paid, hand.winner_short_name, ...)
+issues one query per row.  A profile is the set of loader options that
+matches what one page touches; routes pick theirs by name:
+
+    VC.query.options(*load_profile('vc_overview'))
+
+A profile's options are rooted at the model named in its comment.
+"""
+from sqlalchemy.orm import selectinload, joinedload
+from app.models.vc import VC, VCHand, HandDistribution
+
+
+LOAD_PROFILES = {
+    # VC — vc/view.html: every hand with its payout total and winner names
+    'vc_overview': lambda: (
+        selectinload(VC.hands)
+        .selectinload(VCHand.hand_distributions)
+        .joinedload(HandDistribution.person),
+    ),
+    # VC — vc/hand_distribution.html: the member list; winners and
+    # contributors then resolve from the identity map
+    'hand_detail': lambda: (
+        selectinload(VC.members),
+    ),
+    # VCHand — payout details JSON: winners and their names
+    'hand_payouts': lambda: (
+        selectinload(VCHand.hand_distributions).joinedload(HandDistribution.person),
+    ),
+    # VC — dashboard.html and vc/list.html read only VC columns; their
+    # totals come from grouped queries (dashboard_summary, VCMetricsLoader)
+    'dashboard': lambda: (),
+    'vc_list': lambda: (),
+}
+
+
+def load_profile(name):
+    """Loader options for a named profile (KeyError for an unknown name)."""
+    return LOAD_PROFILES[name]()
@@ -1,20 +1,27 @@
 """Models package for VC-Manager application"""
 from app.models.user import User
-from app.models.enums import PaymentStatus
+from app.models.enums import PaymentStatus, LedgerEntryKind
 from app.models.person import Person
 from app.models.vc import VC, VCHand, HandDistribution
 from app.models.contribution import Contribution
 from app.models.payment import Payment
 from app.models.ledger import LedgerEntry
+from app.models.person_balance import PersonBalance
+from app.models.ledger_checkpoint import LedgerCheckpoint
+from app.models.export_job import ExportJob
 
 __all__ = [
     'User',
     'PaymentStatus',
+    'LedgerEntryKind',
     'Person',
     'VC',
     'VCHand',
     'HandDistribution',
     'Contribution',
     'Payment',
-    'LedgerEntry'
+    'LedgerEntry',
+    'PersonBalance',
+    'LedgerCheckpoint',
+    'ExportJob'
 ]
@@ -5,3 +5,13 @@ class PaymentStatus(Enum):
     PENDING = "pending"
     PARTIAL = "partial"
     PAID = "paid"
+
+class LedgerEntryKind(Enum):
+    CONTRIBUTION       = "contribution"        # member's share of a hand (debit)
+    PAYMENT            = "payment"             # member's payment against a hand's contribution
+    PAYOUT_CREDIT      = "payout_credit"       # winner credited with the hand amount
+    PAYOUT_CASH        = "payout_cash"         # cash actually handed to the winner
+    OPERATOR_INTEREST  = "operator_interest"   # interest earned by the operator on a hand
+    HM_SETTLEMENT      = "hm_settlement"       # operator / HM side of a payout
+    MANUAL             = "manual"              # entered by hand on the ledger page
+    TRANSACTION_MIRROR = "transaction_mirror"  # copy of a dashboard DR/CR transaction
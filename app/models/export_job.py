@@ -0,0 +1,47 @@
+"""ExportJob model — queued ledger PDF/image/statement renders handled by `flask export-worker`"""
+import json
+from datetime import datetime
+from app import db
+
+
+class ExportJob(db.Model):
+    __tablename__ = 'export_jobs'
+    id          = db.Column(db.Integer, primary_key=True)
+    user_id     = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    person_id   = db.Column(db.Integer, db.ForeignKey('persons.id', ondelete='CASCADE'), nullable=True)   # NULL for 'statements'
+    kind        = db.Column(db.String(10), nullable=False)                    # 'pdf', 'jpeg' or 'statements'
+    params      = db.Column(db.Text, nullable=True)                           # JSON: vc_id, from_date, to_date
+    status      = db.Column(db.String(10), nullable=False, default='queued')  # queued / running / done / failed
+    progress    = db.Column(db.Integer, nullable=False, default=0)            # 0 – 100
+    result_path = db.Column(db.String(500), nullable=True)
+    error       = db.Column(db.Text, nullable=True)
+    created_at  = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at  = db.Column(db.DateTime, nullable=True)
+    worker_id   = db.Column(db.String(100), nullable=True)                    # 'host:pid' of the claiming worker
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    person = db.relationship('Person')
+
+    __table_args__ = (
+        db.Index('ix_export_jobs_status_id', 'status', 'id'),
+        db.Index('ix_export_jobs_user_id', 'user_id'),
+    )
+
+    @property
+    def filters(self):
+        return json.loads(self.params) if self.params else {}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'person_id': self.person_id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f'<ExportJob {self.id} {self.kind} {self.status} {self.progress}%>'
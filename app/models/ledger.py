@@ -1,11 +1,17 @@
 """LedgerEntry model for VC-Manager"""
 from datetime import datetime
 from app import db
+from app.models.enums import LedgerEntryKind
 
 class LedgerEntry(db.Model):
     __tablename__ = 'ledger_entries'
     id = db.Column(db.Integer, primary_key=True)
-    person_id = db.Column(db.Integer, db.ForeignKey('persons.id'), nullable=True, index=True)
+    # active_history: moving an entry to another person keeps the old
+    # person_id in the attribute history, so both balance rows are resynced
+    person_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('persons.id', ondelete='CASCADE'), nullable=True, index=True),
+        active_history=True
+    )
     vc_id = db.Column(db.Integer, db.ForeignKey('vcs.id'), nullable=True, index=True)
     hand_id    = db.Column(db.Integer, db.ForeignKey('vc_hands.id'), nullable=True)  
     date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -13,8 +19,19 @@ class LedgerEntry(db.Model):
     debit = db.Column(db.Float, default=0)
     credit = db.Column(db.Float, default=0)
     balance = db.Column(db.Float, default=0)
+    entry_kind = db.Column(db.Enum(LedgerEntryKind, native_enum=False), nullable=True, default=LedgerEntryKind.MANUAL)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_ledger_person_date_id', 'person_id', 'date', 'id'),      # running balance order
+        db.Index('ix_ledger_person_id_id', 'person_id', 'id'),                # latest entry / ledger page
+        db.Index('ix_ledger_vc_person_date', 'vc_id', 'person_id', 'date'),   # operator rows per VC
+        db.Index('ix_ledger_hand_id', 'hand_id'),                             # per-hand rebuild/delete
+        db.Index('ix_ledger_vc_hand_kind_person', 'vc_id', 'hand_id', 'entry_kind', 'person_id'),
+        db.Index('ix_ledger_debit', 'debit'),                                 # amount search
+        db.Index('ix_ledger_credit', 'credit'),                               # amount search
+    )
+
     vc = db.relationship('VC', foreign_keys=[vc_id], back_populates='ledger_entries', lazy=True)
     person = db.relationship(
         'Person',
@@ -0,0 +1,208 @@
+"""LedgerCheckpoint model — per-person closing balances at month boundaries.
+
+A checkpoint at checkpoint_date holds the net movement (credits − debits)
+of every ledger row dated strictly before that date, for the person's whole
+ledger (vc_id NULL) and for each VC separately.  The opening balance is not
+folded in, so editing it never invalidates checkpoints.
+
+balance_as_of() starts from the nearest checkpoint and only sums the rows
+after it.  Checkpoints are built by `flask build-checkpoints` (run it
+periodically, e.g. monthly) and dropped automatically when a ledger row
+dated before them is inserted, edited or deleted.
+"""
+from datetime import datetime
+from sqlalchemy import event, inspect, select, delete, insert, func, bindparam
+from sqlalchemy.orm import Session
+from app import db
+from app.models.ledger import LedgerEntry
+
+
+class LedgerCheckpoint(db.Model):
+    __tablename__ = 'ledger_checkpoints'
+    id              = db.Column(db.Integer, primary_key=True)
+    person_id       = db.Column(db.Integer, db.ForeignKey('persons.id', ondelete='CASCADE'), nullable=False)
+    vc_id           = db.Column(db.Integer, nullable=True)   # NULL = whole ledger
+    checkpoint_date = db.Column(db.DateTime, nullable=False) # first day of a month
+    balance         = db.Column(db.Float, nullable=False, default=0.0)
+    created_at      = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('person_id', 'vc_id', 'checkpoint_date', name='uq_checkpoint_person_vc_date'),
+        db.Index('ix_checkpoint_person_date', 'person_id', 'checkpoint_date'),
+    )
+
+    def __repr__(self):
+        return f'<LedgerCheckpoint {self.person_id}/{self.vc_id} @ {self.checkpoint_date:%Y-%m}: {self.balance}>'
+
+
+def _month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def _next_month(value):
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def balance_as_of(person_id, as_of=None, vc_id=None):
+    """
+    Balance of a person's ledger counting only rows dated before `as_of`
+    (all rows when as_of is None).  With vc_id, only that VC's rows are
+    counted and the opening balance is left out.
+
+    For "balance at the end of day X" pass the midnight after X.
+    """
+    t = LedgerEntry.__table__
+    cp = LedgerCheckpoint.__table__
+
+    checkpoint_q = (
+        select(cp.c.checkpoint_date, cp.c.balance)
+        .where(
+            cp.c.person_id == person_id,
+            cp.c.vc_id == vc_id if vc_id is not None else cp.c.vc_id.is_(None),
+        )
+        .order_by(cp.c.checkpoint_date.desc())
+        .limit(1)
+    )
+    if as_of is not None:
+        checkpoint_q = checkpoint_q.where(cp.c.checkpoint_date <= as_of)
+    checkpoint = db.session.execute(checkpoint_q).first()
+
+    movement = db.func.coalesce(t.c.credit, 0) - db.func.coalesce(t.c.debit, 0)
+    rest_q = select(func.coalesce(func.sum(movement), 0)).where(t.c.person_id == person_id)
+    if vc_id is not None:
+        rest_q = rest_q.where(t.c.vc_id == vc_id)
+    if checkpoint is not None:
+        rest_q = rest_q.where(t.c.date >= checkpoint.checkpoint_date)
+    if as_of is not None:
+        rest_q = rest_q.where(t.c.date < as_of)
+
+    balance = float(checkpoint.balance) if checkpoint is not None else 0.0
+    balance += float(db.session.execute(rest_q).scalar() or 0)
+
+    if vc_id is None:
+        from app.models.person import Person
+        opening = db.session.query(Person.opening_balance).filter(Person.id == person_id).scalar()
+        balance += float(opening or 0)
+    return balance
+
+
+def build_checkpoints(person_id, until=None):
+    """
+    Extend a person's checkpoints up to `until` (default: start of the
+    current month), continuing from their latest valid checkpoint so only
+    the rows after it are read.  Returns the number of checkpoints added.
+    """
+    until = _month_start(until or datetime.utcnow())
+    t = LedgerEntry.__table__
+    cp = LedgerCheckpoint.__table__
+    conn = db.session.connection()
+
+    horizon = conn.execute(
+        select(func.max(cp.c.checkpoint_date))
+        .where(cp.c.person_id == person_id, cp.c.vc_id.is_(None))
+    ).scalar()
+
+    balances = {None: 0.0}
+    if horizon is not None:
+        conn.execute(delete(cp).where(cp.c.person_id == person_id, cp.c.checkpoint_date > horizon))
+        for row in conn.execute(
+            select(cp.c.vc_id, cp.c.balance)
+            .where(cp.c.person_id == person_id, cp.c.checkpoint_date == horizon)
+        ):
+            balances[row.vc_id] = float(row.balance)
+
+    rows_q = (
+        select(t.c.vc_id, t.c.date, t.c.credit, t.c.debit)
+        .where(t.c.person_id == person_id)
+        .order_by(t.c.date.asc(), t.c.id.asc())
+    )
+    if horizon is not None:
+        rows_q = rows_q.where(t.c.date >= horizon)
+
+    new_rows = []
+    boundary = _next_month(horizon) if horizon is not None else None
+
+    def emit(at):
+        for vc_id, balance in balances.items():
+            new_rows.append({
+                'person_id': person_id, 'vc_id': vc_id,
+                'checkpoint_date': at, 'balance': balance,
+            })
+
+    for row in conn.execute(rows_q):
+        if boundary is None:
+            boundary = _next_month(row.date)
+        while boundary <= until and row.date >= boundary:
+            emit(boundary)
+            boundary = _next_month(boundary)
+        if row.date >= until:
+            break
+        amount = float(row.credit or 0) - float(row.debit or 0)
+        balances[None] += amount
+        if row.vc_id is not None:
+            balances[row.vc_id] = balances.get(row.vc_id, 0.0) + amount
+
+    while boundary is not None and boundary <= until:
+        emit(boundary)
+        boundary = _next_month(boundary)
+
+    if new_rows:
+        now = datetime.utcnow()
+        for row in new_rows:
+            row['created_at'] = now
+        conn.execute(insert(cp), new_rows)
+    return len(new_rows)
+
+
+def invalidate_checkpoints(earliest_by_person, connection=None):
+    """Drop checkpoints that counted rows changed on/after the given dates."""
+    conn = connection if connection is not None else db.session.connection()
+    cp = LedgerCheckpoint.__table__
+    params = [
+        {'b_person_id': person_id, 'b_earliest': earliest}
+        for person_id, earliest in earliest_by_person.items()
+        if person_id is not None and earliest is not None
+    ]
+    if params:
+        conn.execute(
+            delete(cp).where(cp.c.person_id == bindparam('b_person_id'),
+                             cp.c.checkpoint_date > bindparam('b_earliest')),
+            params
+        )
+
+
+# ── Flush hook ───────────────────────────────────────────────────────────────
+
+_TRACKED = ('person_id', 'vc_id', 'date', 'credit', 'debit')
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_on_ledger_change(session, flush_context):
+    earliest = {}
+
+    def touch(person_id, when):
+        if person_id is None or when is None:
+            return
+        if person_id not in earliest or when < earliest[person_id]:
+            earliest[person_id] = when
+
+    for obj in session.new:
+        if isinstance(obj, LedgerEntry):
+            touch(obj.person_id, obj.date)
+    for obj in session.deleted:
+        if isinstance(obj, LedgerEntry):
+            touch(obj.person_id, obj.date)
+    for obj in session.dirty:
+        if not isinstance(obj, LedgerEntry):
+            continue
+        state = inspect(obj)
+        histories = {key: state.attrs[key].history for key in _TRACKED}
+        if not any(h.has_changes() for h in histories.values()):
+            continue
+        old_person = (histories['person_id'].deleted or [obj.person_id])[0]
+        old_date = (histories['date'].deleted or [obj.date])[0]
+        touch(old_person, old_date)
+        touch(obj.person_id, obj.date)
+
+    if earliest:
+        invalidate_checkpoints(earliest, connection=session.connection())
@@ -38,12 +38,25 @@ class Person(db.Model):
     ledger_entries = db.relationship(
         'LedgerEntry',
         back_populates='person',
-        cascade='all, delete-orphan'
+        cascade='all, delete-orphan',
+        passive_deletes=True
     )
     transactions = db.relationship(
         'Transaction',
         back_populates='person',
-        cascade='all, delete-orphan'
+        cascade='all, delete-orphan',
+        passive_deletes=True
+    )
+    balance_summary = db.relationship(
+        'PersonBalance',
+        uselist=False,
+        cascade='all, delete-orphan',
+        passive_deletes=True
+    )
+    ledger_checkpoints = db.relationship(
+        'LedgerCheckpoint',
+        cascade='all, delete-orphan',
+        passive_deletes=True
     )
     
     @property
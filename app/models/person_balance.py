@@ -0,0 +1,189 @@
+"""PersonBalance model — materialized running balance per person.
+
+One row per person, kept in step with ledger_entries inside the same flush
+that inserts, edits or deletes a LedgerEntry.  Readers (person list, search,
+balance APIs, posting paths) look the balance up by primary key instead of
+scanning ledger_entries for the highest id.
+
+Bulk statements (query.delete / query.update / Core UPDATE) bypass the ORM
+flush, so code that issues them must call sync_person_balances() afterwards.
+"""
+from sqlalchemy import event, select, update, insert, func, bindparam, inspect
+from sqlalchemy.orm import Session
+from app import db
+from app.models.ledger import LedgerEntry
+
+
+class PersonBalance(db.Model):
+    __tablename__ = 'person_balances'
+    person_id       = db.Column(db.Integer, db.ForeignKey('persons.id', ondelete='CASCADE'), primary_key=True)
+    current_balance = db.Column(db.Float, nullable=True)    # balance of last_entry_id, NULL when no entries
+    last_entry_id   = db.Column(db.Integer, nullable=True)
+    entry_count     = db.Column(db.Integer, nullable=False, default=0)
+    version         = db.Column(db.Integer, nullable=False, default=0)  # bumped on every ledger change
+
+    def __repr__(self):
+        return f'<PersonBalance {self.person_id}: {self.current_balance}>'
+
+
+def _current_balance_query(person_id):
+    return (
+        select(PersonBalance.current_balance)
+        .where(PersonBalance.person_id == person_id, PersonBalance.entry_count > 0)
+    )
+
+
+def get_current_balance(person_id, default=None):
+    """Balance of the person's latest ledger entry, or `default` if they have none."""
+    balance = db.session.execute(_current_balance_query(person_id)).scalar()
+    return float(balance) if balance is not None else default
+
+
+def sync_person_balances(person_ids, connection=None):
+    """Recompute the balance rows for `person_ids` from ledger_entries."""
+    conn = connection if connection is not None else db.session.connection()
+    table = PersonBalance.__table__
+
+    person_ids = sorted({p for p in person_ids if p is not None})
+    if not person_ids:
+        return
+
+    have_row = set(conn.execute(
+        select(table.c.person_id).where(table.c.person_id.in_(person_ids))
+    ).scalars())
+    missing = [pid for pid in person_ids if pid not in have_row]
+    if missing:
+        conn.execute(insert(table), [
+            {'person_id': pid, 'current_balance': None, 'last_entry_id': None, 'entry_count': 0, 'version': 0}
+            for pid in missing
+        ])
+
+    conn.execute(_sync_statement(person_ids))
+
+
+def _sync_statement(person_ids):
+    """
+    One set-based UPDATE of the balance rows for `person_ids`; the
+    subqueries are index-only on (person_id, id).
+    """
+    table = PersonBalance.__table__
+    le = LedgerEntry.__table__
+    latest = le.alias('latest')
+    last_id = (
+        select(func.max(latest.c.id)).where(latest.c.person_id == table.c.person_id)
+        .correlate(table).scalar_subquery()
+    )
+    return (
+        update(table)
+        .where(table.c.person_id.in_(person_ids))
+        .values(
+            current_balance=select(le.c.balance).where(le.c.id == last_id).correlate(table).scalar_subquery(),
+            last_entry_id=last_id,
+            entry_count=select(func.count(le.c.id)).where(le.c.person_id == table.c.person_id)
+                        .correlate(table).scalar_subquery(),
+            version=table.c.version + 1,
+        )
+    )
+
+
+def rebuild_person_balances(connection=None):
+    """Rebuild every balance row from scratch (used by `flask sync-balances`)."""
+    conn = connection if connection is not None else db.session.connection()
+    person_ids = conn.execute(
+        select(LedgerEntry.__table__.c.person_id)
+        .where(LedgerEntry.__table__.c.person_id.isnot(None))
+        .distinct()
+    ).scalars().all()
+    sync_person_balances(person_ids, connection=conn)
+
+
+# ── Flush hook ───────────────────────────────────────────────────────────────
+
+@event.listens_for(Session, 'after_flush')
+def _apply_ledger_changes(session, flush_context):
+    """
+    Fold this flush's LedgerEntry inserts/edits/deletes into person_balances.
+
+    Inserts are applied incrementally in one batched UPDATE, edits with one
+    UPDATE per person;
+    a delete may remove the latest entry, so those persons are recomputed,
+    as are both persons when an entry moves from one ledger to another.
+    """
+    from app.models.person import Person
+
+    new, dirty, deleted = {}, {}, set()
+    for obj in session.new:
+        if isinstance(obj, LedgerEntry) and obj.person_id is not None:
+            new.setdefault(obj.person_id, []).append(obj)
+    for obj in session.dirty:
+        if not isinstance(obj, LedgerEntry) or not session.is_modified(obj):
+            continue
+        history = inspect(obj).attrs.person_id.history
+        if history.has_changes():
+            # Moved between ledgers: recompute both persons, as for a delete
+            deleted.update(pid for pid in (*history.deleted, obj.person_id) if pid is not None)
+        elif obj.person_id is not None:
+            dirty.setdefault(obj.person_id, []).append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, LedgerEntry) and obj.person_id is not None:
+            deleted.add(obj.person_id)
+
+    if not (new or dirty or deleted):
+        return
+
+    # Persons removed in this flush take their balance row with them.
+    removed = {obj.id for obj in session.deleted if isinstance(obj, Person)}
+
+    conn = session.connection()
+    table = PersonBalance.__table__
+    resync = set(deleted)
+
+    # All persons with new entries in one executemany UPDATE; persons with
+    # no balance row yet are recomputed instead.
+    params = []
+    for person_id, entries in new.items():
+        if person_id in resync:
+            continue
+        last = max(entries, key=lambda e: e.id)
+        params.append({'b_person_id': person_id, 'b_count': len(entries),
+                       'b_last_id': last.id, 'b_balance': last.balance})
+    if params:
+        is_newer = (table.c.last_entry_id.is_(None)) | (table.c.last_entry_id < bindparam('b_last_id'))
+        result = conn.execute(
+            update(table)
+            .where(table.c.person_id == bindparam('b_person_id'))
+            .values(
+                entry_count=table.c.entry_count + bindparam('b_count'),
+                current_balance=db.case((is_newer, bindparam('b_balance')), else_=table.c.current_balance),
+                last_entry_id=db.case((is_newer, bindparam('b_last_id')), else_=table.c.last_entry_id),
+                version=table.c.version + 1,
+            ),
+            params
+        )
+        if result.rowcount != len(params):
+            ids = [p['b_person_id'] for p in params]
+            have_row = set(conn.execute(
+                select(table.c.person_id).where(table.c.person_id.in_(ids))
+            ).scalars())
+            resync.update(pid for pid in ids if pid not in have_row)
+
+    for person_id, entries in dirty.items():
+        if person_id in resync:
+            continue
+        # If the latest entry was edited it is the highest-id dirty entry.
+        last = max(entries, key=lambda e: e.id)
+        result = conn.execute(
+            update(table)
+            .where(table.c.person_id == person_id)
+            .values(
+                current_balance=db.case(
+                    (table.c.last_entry_id == last.id, last.balance),
+                    else_=table.c.current_balance
+                ),
+                version=table.c.version + 1,
+            )
+        )
+        if result.rowcount == 0:
+            resync.add(person_id)
+
+    sync_person_balances(resync - removed, connection=conn)
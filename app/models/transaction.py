@@ -6,7 +6,7 @@ class Transaction(db.Model):
     __tablename__ = 'transactions'
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    person_id = db.Column(db.Integer, db.ForeignKey('persons.id'), nullable=False, index=True)
+    person_id = db.Column(db.Integer, db.ForeignKey('persons.id', ondelete='CASCADE'), nullable=False, index=True)
     date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
     amount = db.Column(db.Float, nullable=False)
     type = db.Column(db.String(10), nullable=False)  # 'debit' or 'credit'
@@ -14,6 +14,10 @@ class Transaction(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_transactions_user_date_id', 'user_id', 'date', 'id'),   # recent page, keyset order
+    )
+
     user = db.relationship('User', backref='transactions')
     person = db.relationship('Person', back_populates='transactions')
 
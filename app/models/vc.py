@@ -1,8 +1,14 @@
 """VC models — supports multi-slot members (one person, multiple hands)"""
 from datetime import datetime, timedelta, timezone
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import event, inspect, insert, update, bindparam
+from sqlalchemy.orm import Session
 from app import db
 from app.models.enums import PaymentStatus
 
+# Session.info key of the per-session {vc_id: {person_id: slots}} cache (VC.slot_map)
+SLOT_MAPS_KEY = 'vc_slot_maps'
+
 # ── Association table ────────────────────────────────────────────────────────
 # slots: how many hands this person holds in the VC.
 # Priya with slots=2 counts as 2 members — pays 2× contribution per hand,
@@ -39,17 +45,29 @@ class VC(db.Model):
     ledger_entries = db.relationship('LedgerEntry', back_populates='vc', lazy=True)
     members        = db.relationship('Person', secondary=vc_members, backref='vcs')
 
+    # Metrics preloaded for a whole list of VCs by VCMetricsLoader (app/vc_metrics.py).
+    # The properties below use them when present and query on their own otherwise.
+    _metrics = None
+
     # ── Slot helpers ─────────────────────────────────────────────────────────
 
+    def slot_map(self):
+        """
+        {person_id: slots} for this VC.  Loaded from vc_members once per
+        session (i.e. per request) and shared by every slot lookup; dropped
+        by set_slots, membership changes and commit/rollback.
+        """
+        maps = db.session.info.setdefault(SLOT_MAPS_KEY, {})
+        if self.id not in maps:
+            maps[self.id] = dict(db.session.execute(
+                db.select(vc_members.c.person_id, vc_members.c.slots)
+                .where(vc_members.c.vc_id == self.id)
+            ).all())
+        return maps[self.id]
+
     def get_slots(self, person_id):
         """Slots held by a specific person in this VC (0 if not a member)."""
-        row = db.session.execute(
-            vc_members.select().where(
-                (vc_members.c.vc_id     == self.id) &
-                (vc_members.c.person_id == person_id)
-            )
-        ).fetchone()
-        return row.slots if row else 0
+        return self.slot_map().get(person_id, 0)
 
     def set_slots(self, person_id, slots):
         """Update slot count for a person already in this VC."""
@@ -61,6 +79,7 @@ class VC(db.Model):
             )
             .values(slots=slots)
         )
+        invalidate_slot_maps(db.session, self.id)
 
     @property
     def total_slots(self):
@@ -68,21 +87,35 @@ class VC(db.Model):
         Sum of all slots across all members — equals tenure.
         Rajesh(1) + Priya(2) = 3 total slots for a 3-hand VC.
         """
-        result = db.session.execute(
-            db.select(db.func.sum(vc_members.c.slots))
-            .where(vc_members.c.vc_id == self.id)
-        ).scalar()
-        return int(result or 0)
+        if self._metrics is not None:
+            return self._metrics['total_slots']
+        return sum(slots or 0 for slots in self.slot_map().values())
 
     @property
     def slots_display(self):
         """List of (person, slots) tuples for display — e.g. [(Rajesh, 1), (Priya, 2)]."""
-        rows = db.session.execute(
-            db.select(vc_members.c.person_id, vc_members.c.slots)
-            .where(vc_members.c.vc_id == self.id)
-        ).fetchall()
         person_map = {p.id: p for p in self.members}
-        return [(person_map[r.person_id], r.slots) for r in rows if r.person_id in person_map]
+        return [(person_map[pid], slots) for pid, slots in self.slot_map().items() if pid in person_map]
+
+    def winners_index(self):
+        """
+        {person_id: [(hand_number, amount), ...]} for every person payout in
+        this VC, in hand order — one joined query over hand_distributions.
+        """
+        rows = db.session.execute(
+            db.select(HandDistribution.person_id, VCHand.hand_number, HandDistribution.amount)
+            .join(VCHand, VCHand.id == HandDistribution.hand_id)
+            .where(
+                VCHand.vc_id == self.id,
+                HandDistribution.is_operator_taken.is_(False),
+                HandDistribution.person_id.isnot(None)
+            )
+            .order_by(VCHand.id, HandDistribution.id)
+        )
+        index = {}
+        for person_id, hand_number, amount in rows:
+            index.setdefault(person_id, []).append((hand_number, amount))
+        return index
 
     # ── General properties ────────────────────────────────────────────────────
 
@@ -96,6 +129,8 @@ class VC(db.Model):
 
     @property
     def total_due_per_vc(self):
+        if self._metrics is not None:
+            return self._metrics['total_due']
         return sum(c.amount for h in self.hands for c in h.contributions if not c.paid)
 
     @property
@@ -111,19 +146,27 @@ class VC(db.Model):
         return sum(1 for h in self.hands if h.due_amount == 0)
 
     def create_hands(self):
-        """Create one VCHand per month of tenure."""
-        for month in range(1, self.tenure + 1):
-                from dateutil.relativedelta import relativedelta
-                hand_date = self.start_date + relativedelta(months=month - 1)
-                hand = VCHand(
-                    vc_id=self.id,
-                    hand_number=month,
-                    date=hand_date,
-                    contribution_amount=self.amount / self.tenure,
-                    balance=self.amount,
-                    self_half_option='self'
-                )
-                db.session.add(hand)
+        """Create one VCHand per month of tenure (one executemany INSERT)."""
+        return create_hands_for([self])
+
+    def shift_hands(self, delta):
+        """
+        Move every hand's date by `delta`.  Dates are read once and written
+        back with one executemany UPDATE — SQLite has no portable datetime
+        + interval that keeps SQLAlchemy's stored format.
+        """
+        t = VCHand.__table__
+        rows = db.session.execute(
+            db.select(t.c.id, t.c.date).where(t.c.vc_id == self.id)
+        ).all()
+        if rows:
+            db.session.execute(
+                update(t)
+                .where(t.c.id == bindparam('b_id'))
+                .values(date=bindparam('b_date')),
+                [{'b_id': hand_id, 'b_date': hand_date + delta} for hand_id, hand_date in rows]
+            )
+        return len(rows)
 
 
 class VCHand(db.Model):
@@ -231,4 +274,83 @@ class HandDistribution(db.Model):
     is_vc_money_taken = db.Column(db.Boolean, default=False)
     created_at        = db.Column(db.DateTime, default=datetime.utcnow)
 
-    person = db.relationship('Person', backref='hand_distributions')
\ No newline at end of file
+    person = db.relationship('Person', backref='hand_distributions')
+
+
+# ── Hand schedule ────────────────────────────────────────────────────────────
+
+def hand_schedule(start_date, tenure):
+    """Dates of hands 1..tenure: one per calendar month from start_date (day clamped to month end)."""
+    return [start_date + relativedelta(months=offset) for offset in range(tenure)]
+
+
+def create_hands_for(vcs):
+    """
+    Insert every hand of the given (flushed) VCs with one executemany
+    INSERT.  Returns the number of hands created.
+    """
+    rows = [
+        {
+            'vc_id': vc.id,
+            'hand_number': hand_number,
+            'date': hand_date,
+            'contribution_amount': vc.amount / vc.tenure,
+            'balance': vc.amount,
+            'self_half_option': 'self',
+        }
+        for vc in vcs
+        for hand_number, hand_date in enumerate(hand_schedule(vc.start_date, vc.tenure), start=1)
+    ]
+    if rows:
+        db.session.execute(insert(VCHand), rows)
+    return len(rows)
+
+
+# ── Slot map invalidation ────────────────────────────────────────────────────
+
+def preload_slot_maps(vc_ids):
+    """Load the slot maps of many VCs with one query (see VC.slot_map)."""
+    maps = db.session.info.setdefault(SLOT_MAPS_KEY, {})
+    missing = [vc_id for vc_id in vc_ids if vc_id not in maps]
+    if not missing:
+        return
+    for vc_id in missing:
+        maps[vc_id] = {}
+    rows = db.session.execute(
+        db.select(vc_members.c.vc_id, vc_members.c.person_id, vc_members.c.slots)
+        .where(vc_members.c.vc_id.in_(missing))
+    )
+    for vc_id, person_id, slots in rows:
+        maps[vc_id][person_id] = slots
+
+
+def invalidate_slot_maps(session, vc_id=None):
+    """Forget the cached slot map of one VC, or of every VC."""
+    maps = session.info.get(SLOT_MAPS_KEY)
+    if maps:
+        if vc_id is None:
+            maps.clear()
+        else:
+            maps.pop(vc_id, None)
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_changed_memberships(session, flush_context):
+    from app.models.person import Person
+
+    if not session.info.get(SLOT_MAPS_KEY):
+        return
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, VC) and inspect(obj).attrs.members.history.has_changes():
+            invalidate_slot_maps(session, obj.id)
+        elif isinstance(obj, Person) and (
+            obj in session.deleted or inspect(obj).attrs.vcs.history.has_changes()
+        ):
+            invalidate_slot_maps(session)
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_soft_rollback')
+def _drop_slot_maps(session, *args):
+    invalidate_slot_maps(session)
@@ -0,0 +1,112 @@
+"""Query-plan regression check for the ledger hot paths.
+
+Each entry builds its statement with the helper the routes and the
+rebalance engine call (_ledger_page_query, rebalance_from's queries,
+_posted_rows_query, ...), filled in with SAMPLE_PARAMS, so the check
+follows the real queries as they change.  Statements are compiled for the
+connection's dialect with those values inlined and explained as plain
+SQL.  check_query_plans() asks the
+database for each plan and reports any that fall back to a full table (or
+full index) scan — usually a sign that an index from migrations/ is
+missing or a query stopped matching it.
+"""
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.orm import Query
+
+SAMPLE_PARAMS = {
+    'person_id': 1,
+    'user_id': 1,
+    'vc_id': 1,
+    'hand_id': 1,
+    'id': 1,
+    'date': datetime(2025, 1, 1),
+    'amount': '500',
+}
+
+
+def hot_queries(params=SAMPLE_PARAMS):
+    """[(name, statement)] for the hot paths, built by the routes' own helpers."""
+    from app.models.ledger import LedgerEntry
+    from app.models.person_balance import _current_balance_query, _sync_statement
+    from app.models.transaction import Transaction
+    from app.rebalance import _balance_before_query, _suffix_query
+    from app.routes import hand, ledger, transaction
+    from app.search import amount_range, ledger_amount_matches
+
+    person_id, vc_id, user_id = params['person_id'], params['vc_id'], params['user_id']
+    date, entry_id = params['date'], params['id']
+    person_filters = ledger._ledger_filters(person_id, None, None, None)
+    operator_filters = ledger._operator_filters(user_id, vc_id, None, None)
+
+    cursor = f'{date.isoformat()}|{entry_id}'
+    with current_app.test_request_context('/transactions/transactions', query_string={'page': 2, 'after': cursor}):
+        transactions_page = transaction._transactions_page_query(
+            transaction._filtered_transactions(
+                Transaction.query.filter_by(user_id=user_id).join(Transaction.person)
+            ), 2
+        )
+
+    return [
+        ('person ledger page (latest first)',
+         ledger._ledger_page_query(person_filters, before_id=entry_id)),
+        ('person ledger totals',
+         ledger._ledger_totals_query(
+             ledger._ledger_filters(person_id, None, date.strftime('%Y-%m-%d'), None))),
+        ('balance just before an edit position',
+         _balance_before_query(person_id, None, date, entry_id)),
+        ('ledger suffix to rebalance',
+         _suffix_query(person_id, None, date, entry_id)),
+        ('operator ledger suffix to rebalance',
+         _suffix_query(None, vc_id, date, entry_id)),
+        ('person_balances refresh',
+         _sync_statement([person_id])),
+        ('person balance row',
+         _current_balance_query(person_id)),
+        ('operator ledger page for one VC',
+         ledger._operator_page_query(operator_filters, date, entry_id)),
+        ('operator rollup for a user',
+         ledger._operator_rollup_query(ledger._operator_filters(user_id, None, None, None))),
+        ('last operator balance',
+         hand._last_operator_entry_query(vc_id).limit(1)),
+        ("hand's posted settlement rows",
+         hand._posted_rows_query(LedgerEntry, params['hand_id'])),
+        ('recent transactions page after a cursor',
+         transactions_page),
+        ('person search by ledger amount',
+         ledger_amount_matches(*amount_range(params['amount']))),
+    ]
+
+
+def _sql(connection, statement):
+    """The statement as SQL for this connection's dialect, sample values inlined."""
+    if isinstance(statement, Query):
+        statement = statement.statement
+    return str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+
+
+def _explain(connection, statement):
+    """Return (plan lines, uses_full_scan) for one statement."""
+    sql = _sql(connection, statement)
+
+    if connection.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql).fetchall()
+        lines = [row[-1] for row in rows]
+        # "SEARCH t USING INDEX …" is a seek; "SCAN t" / "SCAN t USING INDEX"
+        # walks the whole table or index.
+        full_scan = any(line.startswith('SCAN ') and 'CONSTANT ROW' not in line for line in lines)
+        return lines, full_scan
+
+    rows = connection.exec_driver_sql('EXPLAIN ' + sql).mappings().fetchall()
+    lines = [f"{row.get('table')}: type={row.get('type')} key={row.get('key')}" for row in rows]
+    full_scan = any(row.get('type') in ('ALL', 'index') for row in rows if row.get('table'))
+    return lines, full_scan
+
+
+def check_query_plans(connection, params=SAMPLE_PARAMS):
+    """Explain every hot query; returns a list of (name, plan lines, full_scan)."""
+    results = []
+    for name, statement in hot_queries(params):
+        lines, full_scan = _explain(connection, statement)
+        results.append((name, lines, full_scan))
+    return results
@@ -0,0 +1,243 @@
+"""Running-balance maintenance for ledger_entries.
+
+A ledger is either one person's rows (person_id) or the operator rows of
+one VC (person_id IS NULL, vc_id).  Balances run in (date, id) order.
+"""
+from sqlalchemy import select, update, bindparam, and_, or_
+from app import db
+from app.models.ledger import LedgerEntry
+from app.models.person import Person
+from app.models.person_balance import sync_person_balances
+
+
+def _ledger_scope(person_id, vc_id):
+    t = LedgerEntry.__table__
+    if person_id is not None:
+        return t.c.person_id == person_id
+    return and_(t.c.person_id.is_(None), t.c.vc_id == vc_id)
+
+
+def _before_position(start_date, start_id):
+    t = LedgerEntry.__table__
+    return or_(
+        t.c.date < start_date,
+        and_(t.c.date == start_date, t.c.id < start_id)
+    )
+
+
+def _balance_before_query(person_id, vc_id, start_date, start_id):
+    """SELECT the balance of the ledger row just before (start_date, start_id)."""
+    t = LedgerEntry.__table__
+    return (
+        select(t.c.balance)
+        .where(_ledger_scope(person_id, vc_id), _before_position(start_date, start_id))
+        .order_by(t.c.date.desc(), t.c.id.desc())
+        .limit(1)
+    )
+
+
+def _suffix_query(person_id, vc_id, start_date, start_id):
+    """SELECT the ledger rows from (start_date, start_id) onward, in balance order."""
+    t = LedgerEntry.__table__
+    return (
+        select(t.c.id, t.c.credit, t.c.debit, t.c.balance)
+        .where(_ledger_scope(person_id, vc_id), ~_before_position(start_date, start_id))
+        .order_by(t.c.date.asc(), t.c.id.asc())
+    )
+
+
+def _opening_balance(person_id):
+    if person_id is None:
+        return 0.0
+    opening = (
+        db.session.query(Person.opening_balance)
+        .filter(Person.id == person_id)
+        .scalar()
+    )
+    return float(opening or 0.0)
+
+
+def rebalance_from(person_id, start_date=None, start_id=0, vc_id=None):
+    """
+    Rewrite running balances from position (start_date, start_id) onward.
+
+    The running total is seeded from the balance of the row just before that
+    position (or the opening balance when there is none), so earlier history
+    is never read or written.  Only rows whose balance actually changes are
+    sent back, in a single executemany UPDATE.  With start_date=None the
+    whole ledger is rebalanced in the database by rebalance_window().
+
+    Returns the number of rows rewritten.
+    """
+    if start_date is None:
+        if person_id is not None:
+            return rebalance_window(person_ids=[person_id], operator_vc_ids=[])
+        return rebalance_window(person_ids=[], operator_vc_ids=[vc_id])
+
+    db.session.flush()
+
+    t = LedgerEntry.__table__
+    prev = db.session.execute(_balance_before_query(person_id, vc_id, start_date, start_id)).scalar()
+    running = float(prev) if prev is not None else _opening_balance(person_id)
+
+    rows = db.session.execute(_suffix_query(person_id, vc_id, start_date, start_id)).all()
+
+    changes = []
+    for row in rows:
+        running += float(row.credit or 0) - float(row.debit or 0)
+        if row.balance != running:
+            changes.append({'_id': row.id, '_balance': running})
+
+    if changes:
+        db.session.execute(
+            update(t)
+            .where(t.c.id == bindparam('_id'))
+            .values(balance=bindparam('_balance')),
+            changes
+        )
+        if person_id is not None:
+            sync_person_balances([person_id])
+
+    return len(changes)
+
+
+# ── Set-based engine ─────────────────────────────────────────────────────────
+
+def _running_balances(person_ids=None, operator_vc_ids=None):
+    """
+    SELECT id, running balance for the requested ledgers, computed in the
+    database as opening_balance + SUM(credit - debit) OVER (PARTITION BY
+    ledger ORDER BY date, id).  None selects every ledger of that kind.
+    """
+    t = LedgerEntry.__table__
+    p = Person.__table__
+    amount = db.func.coalesce(t.c.credit, 0) - db.func.coalesce(t.c.debit, 0)
+    order = (t.c.date.asc(), t.c.id.asc())
+
+    parts = []
+    if person_ids is None or person_ids:
+        person_rows = (
+            select(
+                t.c.id,
+                (db.func.coalesce(p.c.opening_balance, 0) + db.func.sum(amount).over(
+                    partition_by=t.c.person_id, order_by=order, rows=(None, 0)
+                )).label('running')
+            )
+            .select_from(t.join(p, p.c.id == t.c.person_id))
+        )
+        if person_ids is not None:
+            person_rows = person_rows.where(t.c.person_id.in_(person_ids))
+        parts.append(person_rows)
+
+    if operator_vc_ids is None or operator_vc_ids:
+        operator_rows = (
+            select(
+                t.c.id,
+                db.func.sum(amount).over(
+                    partition_by=t.c.vc_id, order_by=order, rows=(None, 0)
+                ).label('running')
+            )
+            .where(t.c.person_id.is_(None))
+        )
+        if operator_vc_ids is not None:
+            operator_rows = operator_rows.where(t.c.vc_id.in_(operator_vc_ids))
+        parts.append(operator_rows)
+
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else db.union_all(*parts)
+
+
+def _supports_update_from(connection):
+    dialect = connection.dialect
+    if dialect.name != 'sqlite':
+        return True
+    return dialect.dbapi.sqlite_version_info >= (3, 33, 0)
+
+
+def rebalance_window(person_ids=None, operator_vc_ids=None):
+    """
+    Recompute running balances for whole ledgers with one UPDATE ... FROM
+    over a window-function subquery (SQLite 3.25+, MySQL 8).  Nothing is
+    loaded into Python.  Pass person_ids / operator_vc_ids to limit the
+    scope; None means every ledger of that kind.
+
+    Returns the number of rows rewritten.
+    """
+    db.session.flush()
+
+    running = _running_balances(person_ids, operator_vc_ids)
+    if running is None:
+        return 0
+
+    t = LedgerEntry.__table__
+    conn = db.session.connection()
+
+    if _supports_update_from(conn):
+        sub = running.subquery('rb')
+        result = conn.execute(
+            update(t)
+            .where(t.c.id == sub.c.id)
+            .where(or_(t.c.balance.is_(None), t.c.balance != sub.c.running))
+            .values(balance=sub.c.running)
+        )
+    else:
+        # SQLite 3.25 – 3.32 has window functions but no UPDATE ... FROM:
+        # materialize the running balances once, then update by primary key.
+        conn.exec_driver_sql('DROP TABLE IF EXISTS temp._rebalance')
+        conn.exec_driver_sql(
+            'CREATE TEMP TABLE _rebalance (id INTEGER PRIMARY KEY, running FLOAT)'
+        )
+        tmp = db.table('_rebalance', db.column('id'), db.column('running'))
+        conn.execute(db.insert(tmp).from_select(['id', 'running'], running))
+        new_balance = select(tmp.c.running).where(tmp.c.id == t.c.id).scalar_subquery()
+        result = conn.execute(
+            update(t)
+            .where(t.c.id.in_(select(tmp.c.id)))
+            .where(or_(t.c.balance.is_(None), t.c.balance != new_balance))
+            .values(balance=new_balance)
+        )
+        conn.exec_driver_sql('DROP TABLE temp._rebalance')
+
+    if person_ids is None:
+        from app.models.person_balance import rebuild_person_balances
+        rebuild_person_balances(connection=conn)
+    else:
+        sync_person_balances(person_ids, connection=conn)
+
+    return result.rowcount
+
+
+def rebalance_scope(person_id=None, vc_id=None, user_id=None):
+    """
+    Set-based rebalance for one person, one VC (its members, the operator
+    person and its operator rows), one user (all their persons and VCs),
+    or everyone when no argument is given.
+    """
+    from app.models.vc import VC, vc_members
+
+    if person_id is not None:
+        return rebalance_window(person_ids=[person_id], operator_vc_ids=[])
+
+    if vc_id is not None:
+        vc = db.session.get(VC, vc_id)
+        if vc is None:
+            return 0
+        person_ids = set(db.session.execute(
+            select(vc_members.c.person_id).where(vc_members.c.vc_id == vc_id)
+        ).scalars())
+        operator = Person.query.filter_by(user_id=vc.user_id, short_name='OPERATOR').first()
+        if operator:
+            person_ids.add(operator.id)
+        return rebalance_window(person_ids=sorted(person_ids), operator_vc_ids=[vc_id])
+
+    if user_id is not None:
+        person_ids = db.session.execute(
+            select(Person.id).where(Person.user_id == user_id)
+        ).scalars().all()
+        vc_ids = db.session.execute(
+            select(VC.id).where(VC.user_id == user_id)
+        ).scalars().all()
+        return rebalance_window(person_ids=person_ids, operator_vc_ids=vc_ids)
+
+    return rebalance_window()
@@ -1,10 +1,11 @@
 """API routes for VC-Manager application"""
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_login import current_user, login_required
 from app import db
 from app.models.vc import VC, VCHand
 from app.models.person import Person
 from app.models.ledger import LedgerEntry
+from app.models.enums import LedgerEntryKind
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
@@ -25,17 +26,14 @@ def vc_details(vc_id):
         if not unpaid_contribs:
             continue
         # Check if all members have payout ledger entry
-        all_have_ledger = True
-        for member in vc.members:
-            narration_like = f"{vc.name} Haath {h.hand_number} mai aapko diye%"
-            ledger_entry = LedgerEntry.query.filter(
-                LedgerEntry.person_id == member.id,
+        paid_out_ids = {
+            pid for (pid,) in db.session.query(LedgerEntry.person_id).filter(
                 LedgerEntry.vc_id == vc.id,
-                LedgerEntry.narration.like(narration_like)
-            ).first()
-            if not ledger_entry:
-                all_have_ledger = False
-                break
+                LedgerEntry.hand_id == h.id,
+                LedgerEntry.entry_kind == LedgerEntryKind.PAYOUT_CASH
+            )
+        }
+        all_have_ledger = all(member.id in paid_out_ids for member in vc.members)
         if all_have_ledger:
             continue
         hands_with_unpaid.append(h)
@@ -70,12 +68,14 @@ def hand_details(hand_id):
     distributed_ids = {d.person_id for d in hand.hand_distributions}
     potential_ids = expected_ids - distributed_ids
 
-    # Exclude persons who already have ledger entries
-    ledger_entries = LedgerEntry.query.filter(
-        LedgerEntry.vc_id == hand.vc.id,
-        LedgerEntry.narration.like(f"{hand.vc.name} Haath {hand.hand_number}: %")
-    ).all()
-    paid_ids = {l.person_id for l in ledger_entries}
+    # Exclude persons who already paid their contribution for this hand
+    paid_ids = {
+        pid for (pid,) in db.session.query(LedgerEntry.person_id).filter(
+            LedgerEntry.vc_id == hand.vc.id,
+            LedgerEntry.hand_id == hand.id,
+            LedgerEntry.entry_kind == LedgerEntryKind.PAYMENT
+        )
+    }
     pending_ids = potential_ids - paid_ids
 
     pending_persons = Person.query.filter(Person.id.in_(pending_ids), Person.user_id==current_user.id).all()
@@ -104,6 +104,23 @@ def person_balance(person_id):
     balance = get_last_balance(person_id)
     return jsonify({'success': True, 'balance': balance, 'name': person.name})
 
+@api_bp.route('/person/<int:person_id>/balance_as_of')
+@login_required
+def person_balance_as_of(person_id):
+    """Balance at the end of ?date=YYYY-MM-DD, optionally for one ?vc_id."""
+    from datetime import datetime, timedelta
+    from app.models.ledger_checkpoint import balance_as_of
+    person = Person.query.filter_by(id=person_id, user_id=current_user.id).first()
+    if not person:
+        return jsonify({'success': False, 'error': 'Person not found'}), 404
+    vc_id = request.args.get('vc_id', type=int)
+    try:
+        day = datetime.strptime(request.args.get('date', ''), '%Y-%m-%d')
+    except ValueError:
+        return jsonify({'success': False, 'error': 'date must be YYYY-MM-DD'}), 400
+    balance = balance_as_of(person_id, day + timedelta(days=1), vc_id=vc_id)
+    return jsonify({'success': True, 'balance': balance, 'date': day.strftime('%Y-%m-%d'), 'vc_id': vc_id})
+
 from app.models.ledger import LedgerEntry   # adjust import if needed
 
 @api_bp.route("/hand/<int:hand_id>/payout_details")
@@ -113,13 +130,13 @@ def hand_payout_details(hand_id):
     if not hand or hand.vc.user_id != current_user.id:
         return jsonify({"error": "Not found"}), 404
 
-    # ✅ STEP 1: Get already paid persons (by narration pattern)
-    narration_like = f"{hand.vc.name} Haath {hand.hand_number} mai aapko diye%"
+    # ✅ STEP 1: Get already paid persons (cash payout entries for this hand)
     paid_person_ids = {
-        l.person_id for l in LedgerEntry.query.filter(
+        pid for (pid,) in db.session.query(LedgerEntry.person_id).filter(
             LedgerEntry.vc_id == hand.vc_id,
-            LedgerEntry.narration.like(narration_like)
-        ).all()
+            LedgerEntry.hand_id == hand.id,
+            LedgerEntry.entry_kind == LedgerEntryKind.PAYOUT_CASH
+        )
     }
 
     print("PAID PERSONS:", paid_person_ids)
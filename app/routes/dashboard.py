@@ -3,9 +3,11 @@ from flask import Blueprint, jsonify, render_template, redirect, url_for, flash,
 from flask_login import current_user, login_required
 from datetime import datetime, date
 from app import db
-from app.models import VC, VCHand, Person, Contribution, LedgerEntry, Payment
+from app.models import VC, VCHand, Person, Contribution, LedgerEntry, Payment, LedgerEntryKind
 from app.models.transaction import Transaction
 from app.forms import PaymentForm, TransactionForm
+from app.dashboard_summary import dashboard_summary
+from app.load_profiles import load_profile
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -14,12 +16,8 @@ dashboard_bp = Blueprint('dashboard', __name__)
 @login_required
 def index():
     """Main dashboard page"""
-    vcs = VC.query.filter_by(user_id=current_user.id).order_by(VC.vc_number).all()
-    total_due = sum(c.amount for vc in vcs for hand in vc.hands for c in hand.contributions if not c.paid)
-    total_vcs = len(vcs)
-    persons = Person.query.filter_by(user_id=current_user.id).all()
-    total_persons = len(persons)
-    all_persons = Person.query.filter_by(user_id=current_user.id).all()
+    summary = dashboard_summary(current_user.id)
+    persons = summary['persons']
 
     form = PaymentForm()
     transaction_form = TransactionForm()
@@ -53,7 +51,8 @@ def index():
             narration=transaction_form.narration.data or '',
             debit=0 if is_credit else amount,
             credit=amount if is_credit else 0,
-            balance=prev_balance + (amount if is_credit else -amount)
+            balance=prev_balance + (amount if is_credit else -amount),
+            entry_kind=LedgerEntryKind.TRANSACTION_MIRROR
         )
         db.session.add(ledger_entry)
 
@@ -71,30 +70,9 @@ def index():
     )
 
     # ── PaymentForm setup ────────────────────────────────────────────────────
-    from app.models.enums import PaymentStatus
-    pending_vcs = VC.query.filter(
-        VC.user_id == current_user.id,
-        VC.status != PaymentStatus.PAID
-    ).all()
-    form.vc_id.choices = [(vc.id, f"VC {vc.vc_number}") for vc in pending_vcs]
-
-    hands_with_unpaid = []
-    for vc in pending_vcs:
-        for hand in vc.hands:
-            unpaid_contribs = Contribution.query.filter_by(hand_id=hand.id, paid=False).all()
-            if unpaid_contribs:
-                hands_with_unpaid.append(hand)
-
-    hands_with_unpaid.sort(key=lambda h: h.id)
-    all_members = {
-        member.id: member
-        for vc in pending_vcs
-        for member in vc.members
-        if member.user_id == current_user.id
-    }
-
-    form.hand_id.choices = [(h.id, f"Hand {h.hand_number}") for h in hands_with_unpaid]
-    form.person_id.choices = [(p.id, p.name) for p in all_members.values()]
+    form.vc_id.choices = [(vc.id, f"VC {vc.vc_number}") for vc in summary['pending_vcs']]
+    form.hand_id.choices = [(h.id, f"Hand {h.hand_number}") for h in summary['hands_with_unpaid']]
+    form.person_id.choices = [(p.id, p.name) for p in summary['members']]
 
     # ── Handle PaymentForm submission ────────────────────────────────────────
     if form.validate_on_submit():
@@ -120,11 +98,13 @@ def index():
         ledger_entry = LedgerEntry(
             person_id=form.person_id.data,
             vc_id=form.vc_id.data,
+            hand_id=form.hand_id.data,
             date=form.date.data or datetime.utcnow(),
             narration=form.narration.data or '',
             debit=0,
             credit=form.amount.data,
-            balance=prev_balance + form.amount.data
+            balance=prev_balance + form.amount.data,
+            entry_kind=LedgerEntryKind.PAYMENT
         )
         db.session.add(ledger_entry)
 
@@ -138,12 +118,13 @@ def index():
         transaction_form=transaction_form,
         recent_transactions=recent_transactions,
         today=date.today(),
-        total_due=total_due,
-        total_vcs=total_vcs,
-        vcs=vcs,
+        total_due=summary['total_due'],
+        due_by_vc=summary['due_by_vc'],
+        total_vcs=summary['total_vcs'],
+        vcs=summary['vcs'],
         persons=persons,
-        total_persons=total_persons,
-        all_persons=all_persons
+        total_persons=summary['total_persons'],
+        all_persons=persons
     )
 
 
@@ -151,7 +132,7 @@ def index():
 @login_required
 def hand_payout_details(hand_id):
     """Returns winners and their payout amounts for a distributed hand."""
-    hand = db.session.get(VCHand, hand_id)
+    hand = db.session.get(VCHand, hand_id, options=load_profile('hand_payouts'))
     if not hand or hand.vc.user_id != current_user.id:
         return jsonify({"error": "Not found"}), 404
 
@@ -171,7 +152,8 @@ def hand_payout_details(hand_id):
 @login_required
 def person_balance(person_id):
     """Returns current ledger balance for a person."""
+    from app.routes.ledger import get_last_balance
     person = Person.query.filter_by(id=person_id, user_id=current_user.id).first()
     if not person:
         return jsonify({"success": False}), 404
-    return jsonify({"success": True, "balance": person.ledger_balance})
\ No newline at end of file
+    return jsonify({"success": True, "balance": get_last_balance(person_id)})
\ No newline at end of file
@@ -22,20 +22,34 @@ OPERATOR KEEPS:
   • Operator (HM) → CREDIT interest_charged
 
 REQUIRES: A Person with short_name='HM' belonging to current_user.
+
+The postings themselves are computed by app.settlement.SettlementEngine
+and written here in one batch.
 ─────────────────────────────────────────────────────────────────────────────
 """
 
 from datetime import datetime
-from flask import Blueprint, request, redirect, url_for, flash
+from flask import Blueprint, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy import select, insert, update, delete, bindparam
 from app import db
 from app.models.vc import VCHand, HandDistribution
 from app.models.person import Person
 from app.models.contribution import Contribution
 from app.models.ledger import LedgerEntry
+from app.models.person_balance import PersonBalance, get_current_balance, sync_person_balances
+from app.models.ledger_checkpoint import invalidate_checkpoints
+from app.rebalance import rebalance_from
+from app.settlement import Settlement, SettlementEngine, DIFF_COLUMNS, SETTLEMENT_KINDS
 
 hand_bp = Blueprint('hand', __name__)
 
+_SETTLEMENT_TABLES = (
+    ('distributions', HandDistribution),
+    ('contributions', Contribution),
+    ('ledger_entries', LedgerEntry),
+)
+
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
@@ -48,22 +62,24 @@ def _redirect_hand(hand):
 
 
 def get_last_balance(person_id):
-    last = (
-        LedgerEntry.query
-        .filter_by(person_id=person_id)
-        .order_by(LedgerEntry.id.desc())
-        .first()
-    )
-    return float(last.balance) if last else 0.0
+    balance = get_current_balance(person_id)
+    if balance is not None:
+        return balance
+    # No entries yet — start from the opening balance, as rebalancing does
+    person = db.session.get(Person, person_id)
+    return float(person.opening_balance or 0.0) if person else 0.0
 
 
-def get_last_operator_balance(vc_id):
-    last = (
+def _last_operator_entry_query(vc_id):
+    return (
         LedgerEntry.query
         .filter_by(vc_id=vc_id, person_id=None)
         .order_by(LedgerEntry.id.desc())
-        .first()
     )
+
+
+def get_last_operator_balance(vc_id):
+    last = _last_operator_entry_query(vc_id).first()
     return float(last.balance) if last else 0.0
 
 
@@ -71,131 +87,186 @@ def _get_operator(user_id):
     return Person.query.filter_by(user_id=user_id, short_name='OPERATOR').first()
 
 
-def _add_operator_ledger(hand, net_amount, now, narration=None):
-    prev_balance = get_last_operator_balance(hand.vc_id)
-    credit = net_amount if net_amount >= 0 else 0
-    debit  = abs(net_amount) if net_amount < 0 else 0
+def _last_balances(person_ids):
+    """get_last_balance() for many persons with one query."""
+    if not person_ids:
+        return {}
+    rows = db.session.execute(
+        db.select(Person.id, Person.opening_balance, PersonBalance.current_balance, PersonBalance.entry_count)
+        .outerjoin(PersonBalance, PersonBalance.person_id == Person.id)
+        .where(Person.id.in_(person_ids))
+    ).all()
+    balances = {pid: 0.0 for pid in person_ids}
+    for person_id, opening_balance, current_balance, entry_count in rows:
+        if entry_count and current_balance is not None:
+            balances[person_id] = float(current_balance)
+        else:
+            balances[person_id] = float(opening_balance or 0.0)
+    return balances
+
+
+def _parse_payout_form(form, user_id):
+    """
+    Payout form fields, validated: a dict with payout_type, narration,
+    interest_charged and either bid_price (operator keeps) or winners as
+    [(person_id, name, amount), ...].  Raises ValueError with the message
+    to show the user.
+    """
+    payout = {
+        'payout_type': form.get('payout_type', 'person'),
+        'narration':   form.get('narration', '').strip(),
+    }
 
-    entry = LedgerEntry(
-        person_id=None,
-        vc_id=hand.vc_id,
-        hand_id=hand.id,
-        date=now,
-        narration=narration or f"Hand {hand.hand_number} — operator settlement",
-        credit=credit,
-        debit=debit,
-        balance=prev_balance + net_amount
-    )
-    db.session.add(entry)
-    db.session.flush()
+    try:
+        payout['interest_charged'] = float(form.get('interest_charged', 0))
+    except ValueError:
+        raise ValueError("Invalid interest charged amount.")
 
+    if payout['payout_type'] == 'operator':
+        try:
+            payout['bid_price'] = float(form['bid_price'])
+        except (KeyError, ValueError):
+            raise ValueError("Invalid bid price.")
+        return payout
 
-def _add_hm_ledger(hand, operator, net_amount, now, narration=None):
-    prev_balance = get_last_balance(operator.id)
-    credit = net_amount if net_amount > 0 else 0
-    debit  = abs(net_amount) if net_amount < 0 else 0
+    winner_ids = form.getlist('winners[]')
+    amounts    = form.getlist('amounts[]')
 
-    entry = LedgerEntry(
-        person_id=operator.id,
-        vc_id=hand.vc_id,
-        hand_id=hand.id,
-        date=now,
-        narration=narration or f"Hand {hand.hand_number} — HM settlement",
-        credit=credit,
-        debit=debit,
-        balance=prev_balance + net_amount
+    if not winner_ids:
+        raise ValueError("Please select at least one winner.")
+    if len(winner_ids) != len(amounts):
+        raise ValueError("Winner and amount counts do not match.")
+
+    try:
+        winner_ids = [int(x) for x in winner_ids]
+    except ValueError:
+        raise ValueError("Invalid winner.")
+    try:
+        parsed_amounts = [float(a) for a in amounts]
+    except ValueError:
+        raise ValueError("Invalid amount value.")
+
+    names = dict(
+        db.session.query(Person.id, Person.name)
+        .filter(Person.id.in_(winner_ids), Person.user_id == user_id)
+        .all()
     )
-    db.session.add(entry)
-    db.session.flush()
+    for person_id in winner_ids:
+        if person_id not in names:
+            raise ValueError(f"Person {person_id} not found.")
 
+    payout['winners'] = [
+        (person_id, names[person_id], amount)
+        for person_id, amount in zip(winner_ids, parsed_amounts)
+    ]
+    return payout
 
-def _build_contributions(hand, vc, interest_charged, now):
-    total_slots       = int(vc.total_slots)
-    contribution_pool = float(vc.amount) - interest_charged
-    contrib_per_slot  = contribution_pool / total_slots if total_slots > 0 else 0
-
-    for member in vc.members:
-        if member is None:
-            continue
-        member_slots = vc.get_slots(member.id)
-        if member_slots == 0:
-            continue
-        member_contribution = contrib_per_slot * member_slots
-
-        contribution = Contribution(
-            hand_id=hand.id,
-            person_id=member.id,
-            amount=member_contribution,
-            date=now,
-            paid=False
-        )
-        db.session.add(contribution)
-        db.session.flush()
-
-        current_balance = get_last_balance(member.id)
-        ledger_entry = LedgerEntry(
-            person_id=member.id,
-            vc_id=vc.id,
-            hand_id=hand.id,
-            date=hand.date,
-            narration=f"{vc.name} Haath {hand.hand_number} mai aapka hissa raha",
-            debit=member_contribution,
-            credit=0,
-            balance=current_balance - member_contribution
-        )
-        db.session.add(ledger_entry)
-        db.session.flush()
 
+def _settle(hand, vc, operator, payout, now):
+    """
+    Run the SettlementEngine for a parsed payout form.  Reads the slot
+    map and every starting balance it needs up front, then computes the
+    postings in memory — nothing is written.
+    """
+    slot_map = {m.id: vc.get_slots(m.id) for m in vc.members if m is not None}
+    person_ids = set(slot_map) | {operator.id}
+    person_ids.update(person_id for person_id, _, _ in payout.get('winners', ()))
+
+    engine = SettlementEngine(
+        vc, hand, slot_map,
+        balances=_last_balances(person_ids),
+        operator_balance=get_last_operator_balance(vc.id),
+        operator_id=operator.id,
+        now=now
+    )
+    if payout['payout_type'] == 'operator':
+        return engine.operator_keeps(payout['bid_price'], payout['interest_charged'], payout['narration'])
+    return engine.person_payout(payout['winners'], payout['interest_charged'], payout['narration'])
 
-def _delete_hand_entries(hand):
-    """Delete only ledger/contribution entries for this specific hand."""
-    LedgerEntry.query.filter_by(hand_id=hand.id).delete(synchronize_session=False)
-    HandDistribution.query.filter_by(hand_id=hand.id).delete(synchronize_session=False)
-    Contribution.query.filter_by(hand_id=hand.id).delete(synchronize_session=False)
+
+def _persist_settlement(settlement):
+    """
+    Insert a settlement's rows with one executemany INSERT per table.
+    Bulk inserts skip the flush hooks, so person_balances and checkpoints
+    are brought up to date here.
+    """
     db.session.flush()
+    db.session.execute(insert(HandDistribution), settlement.distributions)
+    if settlement.contributions:
+        db.session.execute(insert(Contribution), settlement.contributions)
+    db.session.execute(insert(LedgerEntry), settlement.ledger_entries)
+
+    earliest = {}
+    for row in settlement.ledger_entries:
+        person_id = row['person_id']
+        if person_id is not None and (person_id not in earliest or row['date'] < earliest[person_id]):
+            earliest[person_id] = row['date']
+    sync_person_balances(list(earliest))
+    invalidate_checkpoints(earliest)
+
+
+def _posted_rows_query(model, hand_id):
+    """SELECT a hand's settlement rows from one of the _SETTLEMENT_TABLES, in id order."""
+    t = model.__table__
+    query = select(t).where(t.c.hand_id == hand_id).order_by(t.c.id)
+    if model is LedgerEntry:
+        query = query.where(t.c.entry_kind.in_(SETTLEMENT_KINDS))
+    return query
+
+
+def _posted_settlement(hand):
+    """
+    The hand's current settlement rows as a Settlement of dicts (with
+    ids), in id order.  Payments recorded against the hand are not part
+    of it, so an edit never touches them.
+    """
+    posted = Settlement()
+    for table, model in _SETTLEMENT_TABLES:
+        rows = db.session.execute(_posted_rows_query(model, hand.id)).mappings().all()
+        setattr(posted, table, [dict(row) for row in rows])
+    return posted
 
 
-def _recalculate_balances_for_vc(vc):
+def _apply_settlement_diff(hand, diff):
     """
-    After editing any hand, recalculate running balances
-    for every member of this VC and the operator ledger.
+    Write a SettlementDiff with at most one DELETE, executemany UPDATE and
+    executemany INSERT per table, then rebalance only the ledgers whose
+    amounts or dates changed, each from its earliest changed row.  Core
+    statements skip the flush hooks, so person_balances and checkpoints
+    are brought up to date here.
     """
-    member_ids = [m.id for m in vc.members if m is not None]
-
-    operator = _get_operator(vc.user_id)
-    if operator:
-        member_ids.append(operator.id)
-
-    for person_id in set(member_ids):
-        person = Person.query.get(person_id)
-        if not person:
-            continue
-
-        entries = (
-            LedgerEntry.query
-            .filter_by(person_id=person_id)
-            .order_by(LedgerEntry.date.asc(), LedgerEntry.id.asc())
-            .all()
-        )
+    db.session.flush()
+    for table, model in _SETTLEMENT_TABLES:
+        t = model.__table__
+        deleted = [row['id'] for row in diff.deletes[table]]
+        if deleted:
+            db.session.execute(delete(t).where(t.c.id.in_(deleted)))
+
+        if diff.updates[table]:
+            _, compared = DIFF_COLUMNS[table]
+            db.session.execute(
+                update(t)
+                .where(t.c.id == bindparam('b_id'))
+                .values({c: bindparam(f'b_{c}') for c in compared}),
+                [
+                    {'b_id': new['id'], **{f'b_{c}': new[c] for c in compared}}
+                    for _, new in diff.updates[table]
+                ]
+            )
 
-        running = float(person.opening_balance or 0)
-        for entry in entries:
-            running += float(entry.credit or 0) - float(entry.debit or 0)
-            entry.balance = running
+        if diff.inserts[table]:
+            db.session.execute(insert(model), diff.inserts[table])
 
-    # Recalculate operator (person_id=None) ledger for this VC
-    op_entries = (
-        LedgerEntry.query
-        .filter_by(person_id=None, vc_id=vc.id)
-        .order_by(LedgerEntry.date.asc(), LedgerEntry.id.asc())
-        .all()
-    )
-    running = 0.0
-    for entry in op_entries:
-        running += float(entry.credit or 0) - float(entry.debit or 0)
-        entry.balance = running
+    changed = diff.changed_ledgers()
+    invalidate_checkpoints(changed)
 
-    db.session.flush()
+    person_ids = [person_id for person_id in changed if person_id is not None]
+    for person_id in person_ids:
+        rebalance_from(person_id, changed[person_id])
+    if None in changed:
+        rebalance_from(None, changed[None], vc_id=hand.vc_id)
+
+    sync_person_balances(person_ids)
 
 
 # ── Routes ───────────────────────────────────────────────────────────────────
@@ -223,120 +294,22 @@ def create_payout(hand_id):
         flash("This hand has already been distributed.", "warning")
         return _redirect_hand(hand)
 
-    payout_type = request.form.get('payout_type', 'person')
-    narration   = request.form.get('narration', '').strip()
-    now         = datetime.utcnow()
-
     try:
-        interest_charged = float(request.form.get('interest_charged', 0))
-    except (KeyError, ValueError):
-        flash("Invalid interest charged amount.", "danger")
-        return _redirect_hand(hand)
-
-    # ── OPERATOR KEEPS ───────────────────────────────────────────────────────
-    if payout_type == 'operator':
-        try:
-            bid_price = float(request.form['bid_price'])
-        except (KeyError, ValueError):
-            flash("Invalid bid price.", "danger")
-            return _redirect_hand(hand)
-
-        db.session.add(HandDistribution(
-            hand_id=hand.id,
-            person_id=None,
-            amount=bid_price,
-            narration=narration or f"Operator kept Hand {hand.hand_number}",
-            payment_date=now,
-            is_operator_taken=True,
-            is_vc_money_taken=True
-        ))
-
-        _build_contributions(hand, vc, interest_charged, now)
-
-        _add_operator_ledger(
-            hand, interest_charged, now,
-            narration=f"Hand {hand.hand_number} — operator kept (interest ₹{interest_charged:,.0f})"
-        )
-
-        db.session.commit()
-        flash(f"Hand {hand.hand_number} recorded as operator-kept (₹{bid_price:,.0f}).", "success")
+        payout = _parse_payout_form(request.form, current_user.id)
+    except ValueError as e:
+        flash(str(e), "danger")
         return _redirect_hand(hand)
 
-    # ── PERSON(S) WIN ────────────────────────────────────────────────────────
-    winner_ids = request.form.getlist('winners[]')
-    amounts    = request.form.getlist('amounts[]')
-
-    if not winner_ids:
-        flash("Please select at least one winner.", "danger")
-        return _redirect_hand(hand)
-
-    if len(winner_ids) != len(amounts):
-        flash("Winner and amount counts do not match.", "danger")
-        return _redirect_hand(hand)
+    _persist_settlement(_settle(hand, vc, operator, payout, datetime.utcnow()))
+    db.session.commit()
 
-    try:
-        parsed_amounts = [float(a) for a in amounts]
-    except ValueError:
-        flash("Invalid amount value.", "danger")
+    interest_charged = payout['interest_charged']
+    if payout['payout_type'] == 'operator':
+        flash(f"Hand {hand.hand_number} recorded as operator-kept (₹{payout['bid_price']:,.0f}).", "success")
         return _redirect_hand(hand)
 
-    total_bid = sum(parsed_amounts)
-
-    for i, (person_id_str, amount) in enumerate(zip(winner_ids, parsed_amounts)):
-        person_id = int(person_id_str)
-        person = Person.query.filter_by(id=person_id, user_id=current_user.id).first()
-
-        if not person:
-            flash(f"Person {person_id} not found.", "danger")
-            db.session.rollback()
-            return _redirect_hand(hand)
-
-        db.session.add(HandDistribution(
-            hand_id=hand.id,
-            person_id=person_id,
-            amount=amount,
-            narration=narration or f"{vc.name} Haath {hand.hand_number} mai aapko diye",
-            payment_date=now,
-            is_operator_taken=False,
-            is_vc_money_taken=True
-        ))
-
-        # Credit winner
-        prev_balance = get_last_balance(person_id)
-        db.session.add(LedgerEntry(
-            person_id=person_id,
-            vc_id=hand.vc_id,
-            hand_id=hand.id,
-            date=hand.date,
-            narration=f"{vc.name} Haath {hand.hand_number} aapki rahi hai",
-            credit=amount,
-            debit=0,
-            balance=prev_balance + amount
-        ))
-        db.session.flush()
-
-        # HM debit — skip first winner
-        if i > 0:
-            _add_hm_ledger(
-                hand, operator, -amount, now,
-                narration=f"{vc.name} Hand {hand.hand_number} mai {person.name} ko gaye"
-            )
-
-        _add_operator_ledger(
-            hand, -amount, now,
-            narration=f"Hand {hand.hand_number} — paid out to {person.name} ₹{amount:,.0f}"
-        )
-
-    _build_contributions(hand, vc, interest_charged, now)
-
-    _add_operator_ledger(
-        hand, interest_charged, now,
-        narration=f"Hand {hand.hand_number} — interest charged ₹{interest_charged:,.0f}"
-    )
-
-    db.session.commit()
-
-    winner_count = len(winner_ids)
+    winner_count = len(payout['winners'])
+    total_bid    = sum(amount for _, _, amount in payout['winners'])
     flash(
         f"Hand {hand.hand_number} distributed to "
         f"{winner_count} winner{'s' if winner_count > 1 else ''} "
@@ -365,116 +338,60 @@ def edit_payout(vc_id, hand_id):
         )
         return redirect(url_for('vc.view_hand_distribution', vc_id=vc_id, hand_number=hand.hand_number))
 
-    payout_type = request.form.get('payout_type', 'person')
-    narration   = request.form.get('narration', '').strip()
-    now         = datetime.utcnow()
-
     try:
-        interest_charged = float(request.form.get('interest_charged', 0))
-    except (KeyError, ValueError):
-        flash("Invalid interest charged amount.", "danger")
+        payout = _parse_payout_form(request.form, current_user.id)
+    except ValueError as e:
+        flash(str(e), "danger")
         return redirect(url_for('vc.view_hand_distribution', vc_id=vc_id, hand_number=hand.hand_number))
 
-    # Delete only this hand's entries — full rebuild
-    _delete_hand_entries(hand)
-
-    # ── OPERATOR KEEPS ───────────────────────────────────────────────────────
-    if payout_type == 'operator':
-        try:
-            bid_price = float(request.form['bid_price'])
-        except (KeyError, ValueError):
-            flash("Invalid bid price.", "danger")
-            return redirect(url_for('vc.view_hand_distribution', vc_id=vc_id, hand_number=hand.hand_number))
-
-        db.session.add(HandDistribution(
-            hand_id=hand.id,
-            person_id=None,
-            amount=bid_price,
-            narration=narration or f"Operator kept Hand {hand.hand_number}",
-            payment_date=now,
-            is_operator_taken=True,
-            is_vc_money_taken=True
-        ))
-
-        _build_contributions(hand, vc, interest_charged, now)
-
-        _add_operator_ledger(
-            hand, interest_charged, now,
-            narration=f"Hand {hand.hand_number} — operator kept (interest ₹{interest_charged:,.0f})"
-        )
+    # Only rows that differ from what the hand already has are written
+    settlement = _settle(hand, vc, operator, payout, datetime.utcnow())
+    _apply_settlement_diff(hand, settlement.diff(_posted_settlement(hand)))
+    db.session.commit()
 
-        _recalculate_balances_for_vc(vc)
-        db.session.commit()
+    if payout['payout_type'] == 'operator':
         flash("Payout updated: operator-kept.", "success")
-        return redirect(url_for('vc.view_hand_distribution', vc_id=vc_id, hand_number=hand.hand_number))
-
-    # ── PERSON(S) WIN ────────────────────────────────────────────────────────
-    winner_ids = request.form.getlist('winners[]')
-    amounts    = request.form.getlist('amounts[]')
+    else:
+        flash("Payout updated successfully.", "success")
+    return redirect(url_for('vc.view_hand_distribution', vc_id=vc_id, hand_number=hand.hand_number))
 
-    if not winner_ids or len(winner_ids) != len(amounts):
-        flash("Invalid winner/amount data.", "danger")
-        return redirect(url_for('vc.view_hand_distribution', vc_id=vc_id, hand_number=hand.hand_number))
 
-    try:
-        parsed_amounts = [float(a) for a in amounts]
-    except ValueError:
-        flash("Invalid amount value.", "danger")
-        return redirect(url_for('vc.view_hand_distribution', vc_id=vc_id, hand_number=hand.hand_number))
-
-    total_bid = sum(parsed_amounts)
-
-    for idx, (person_id, amount) in enumerate(zip([int(x) for x in winner_ids], parsed_amounts)):
-        person = Person.query.filter_by(id=person_id, user_id=current_user.id).first()
-        if not person:
-            flash(f"Person {person_id} not found.", "danger")
-            db.session.rollback()
-            return redirect(url_for('vc.view_hand_distribution', vc_id=vc_id, hand_number=hand.hand_number))
-
-        db.session.add(HandDistribution(
-            hand_id=hand.id,
-            person_id=person_id,
-            amount=amount,
-            narration=narration or f"{vc.name} Haath {hand.hand_number} mai aapko diye",
-            payment_date=now,
-            is_operator_taken=False,
-            is_vc_money_taken=True
-        ))
-
-        # Credit winner
-        prev_balance = get_last_balance(person_id)
-        db.session.add(LedgerEntry(
-            person_id=person_id,
-            vc_id=hand.vc_id,
-            hand_id=hand.id,
-            date=hand.date,
-            narration=f"{vc.name} Haath {hand.hand_number} aapki rahi hai",
-            credit=amount,
-            debit=0,
-            balance=prev_balance + amount
-        ))
-        db.session.flush()
-
-        # HM debit — skip first winner
-        if idx > 0:
-            _add_hm_ledger(
-                hand, operator, -amount, now,
-                narration=f"{vc.name} Hand {hand.hand_number} mai {person.name} ko gaye"
-            )
-
-        _add_operator_ledger(
-            hand, -amount, now,
-            narration=f"Hand {hand.hand_number} — paid out to {person.name} ₹{amount:,.0f}"
-        )
+@hand_bp.route('/<int:vc_id>/hand/<int:hand_id>/settlement-preview', methods=['POST'])
+@login_required
+def settlement_preview(vc_id, hand_id):
+    """
+    Dry run of create/edit payout: takes the same form and returns the
+    distributions, contributions and ledger rows that would be written,
+    as JSON, with per-table counts of the rows an edit would insert,
+    update and delete.  Nothing is saved.  Running balances start from
+    the current ledger, so for a hand that is already distributed they
+    still include its existing postings.
+    """
+    hand = VCHand.query.get_or_404(hand_id)
+    vc   = hand.vc
 
-    _build_contributions(hand, vc, interest_charged, now)
+    if vc.user_id != current_user.id or vc.id != vc_id:
+        return jsonify({"error": "Not found"}), 404
 
-    _add_operator_ledger(
-        hand, interest_charged, now,
-        narration=f"Hand {hand.hand_number} — interest charged ₹{interest_charged:,.0f}"
-    )
+    operator = _get_operator(current_user.id)
+    if not operator:
+        return jsonify({"error": "Operator person not found."}), 400
 
-    _recalculate_balances_for_vc(vc)
-    db.session.commit()
-    flash("Payout updated successfully.", "success")
-    return redirect(url_for('vc.view_hand_distribution', vc_id=vc_id, hand_number=hand.hand_number))
\ No newline at end of file
+    try:
+        payout = _parse_payout_form(request.form, current_user.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    settlement = _settle(hand, vc, operator, payout, datetime.utcnow())
+    diff = settlement.diff(_posted_settlement(hand))
+
+    preview = settlement.to_dict()
+    preview['changes'] = {
+        table: {
+            'insert': len(diff.inserts[table]),
+            'update': len(diff.updates[table]),
+            'delete': len(diff.deletes[table]),
+        }
+        for table in DIFF_COLUMNS
+    }
+    return jsonify(preview)
@@ -1,30 +1,36 @@
 """Ledger routes for VC-Manager application - Updated with Image Export and Clear"""
-from flask import Blueprint, render_template, redirect, url_for, flash, request, send_file
+import os
+from flask import Blueprint, render_template, redirect, url_for, flash, request, send_file, make_response, jsonify
 from flask_login import current_user, login_required
-from datetime import datetime
+from datetime import datetime, timedelta
 from io import BytesIO
+from sqlalchemy import func, select, or_, and_
 from weasyprint import HTML
 from pdf2image import convert_from_bytes
 from app import db
 from app.models.person import Person
 from app.models.ledger import LedgerEntry
+from app.models.enums import LedgerEntryKind
+from app.models.person_balance import get_current_balance, sync_person_balances
+from app.models.ledger_checkpoint import balance_as_of, invalidate_checkpoints
 from app.models.vc import VC
+from app.rebalance import rebalance_from
+from app.exports import stream_rows, csv_response, format_date, format_amount
+from app.export_cache import export_key, cached_export, store_export
+from app.export_jobs import EXPORT_KINDS, STATEMENTS_KIND, enqueue_export, enqueue_statements
+from app.statements import parse_period
+from app.models.export_job import ExportJob
 from app.forms import LedgerEntryForm
 
 ledger_bp = Blueprint('ledger', __name__, url_prefix='/ledger')
 
+LEDGER_PAGE_SIZE = 100
+
 def get_last_balance(person_id):
     """Return balance of highest ledger_entries.id for this person"""
-    
-    last_entry = (
-        db.session.query(LedgerEntry)
-        .filter(LedgerEntry.person_id == person_id)
-        .order_by(LedgerEntry.id.desc())
-        .first()
-    )
-
-    if last_entry:
-        return float(last_entry.balance)
+    balance = get_current_balance(person_id)
+    if balance is not None:
+        return balance
 
     # fallback
     opening_balance = (
@@ -35,22 +41,70 @@ def get_last_balance(person_id):
 
     return float(opening_balance or 0.0)
 
-def recalculate_balances(person_id):
-    entries = (
-        LedgerEntry.query
-        .filter_by(person_id=person_id)
-        .order_by(LedgerEntry.date.asc(), LedgerEntry.id.asc())
-        .all()
-    )
+def recalculate_balances(person_id, start_date=None, start_id=0):
+    """Rebalance this person's ledger from (start_date, start_id) onward."""
+    rebalance_from(person_id, start_date, start_id)
+    db.session.commit()
 
-    person = Person.query.get(person_id)
-    running = float(person.opening_balance or 0)
+def _statement_closing_balance(person_id, to_date):
+    """Whole-ledger balance at the end of to_date (or today if not given)."""
+    if not to_date:
+        return balance_as_of(person_id)
+    end = datetime.strptime(to_date, '%Y-%m-%d') + timedelta(days=1)
+    return balance_as_of(person_id, end)
 
-    for e in entries:
-        running += float(e.credit or 0) - float(e.debit or 0)
-        e.balance = running
+def _ledger_filters(person_id, vc_id, from_date, to_date):
+    """WHERE clauses for a person's ledger with the page's filters applied."""
+    filters = [LedgerEntry.person_id == person_id]
 
-    db.session.commit()
+    if vc_id:
+        filters.append(LedgerEntry.vc_id == vc_id)
+
+    if from_date:
+        filters.append(
+            LedgerEntry.date >= datetime.strptime(from_date + ' 00:00:00', '%Y-%m-%d %H:%M:%S')
+        )
+
+    if to_date:
+        filters.append(
+            LedgerEntry.date <= datetime.strptime(to_date + ' 23:59:59', '%Y-%m-%d %H:%M:%S')
+        )
+
+    return filters
+
+def _ledger_page_query(filters, before_id=None):
+    """Entries latest first, strictly older than before_id: one page plus one row."""
+    query = LedgerEntry.query.filter(*filters)
+    if before_id:
+        query = query.filter(LedgerEntry.id < before_id)
+    return query.order_by(LedgerEntry.id.desc()).limit(LEDGER_PAGE_SIZE + 1)
+
+def _ledger_page(filters, before_id=None):
+    """
+    One page of entries, latest first, strictly older than before_id.
+    Returns (entries, next_before_id); next_before_id is None on the last page.
+    """
+    entries = _ledger_page_query(filters, before_id).all()
+    if len(entries) > LEDGER_PAGE_SIZE:
+        entries = entries[:LEDGER_PAGE_SIZE]
+        return entries, entries[-1].id
+    return entries, None
+
+def _ledger_totals_query(filters):
+    return db.session.query(
+        func.count(LedgerEntry.id),
+        func.coalesce(func.sum(LedgerEntry.debit), 0),
+        func.coalesce(func.sum(LedgerEntry.credit), 0)
+    ).filter(*filters)
+
+def _ledger_totals(filters):
+    """Entry count and debit/credit sums over the whole filtered ledger."""
+    count, total_debit, total_credit = _ledger_totals_query(filters).one()
+    return {
+        'count': count,
+        'debit': float(total_debit),
+        'credit': float(total_credit),
+    }
 
 @ledger_bp.route('/<int:person_id>')
 @login_required
@@ -65,35 +119,51 @@ def person_ledger(person_id):
     from_date = request.args.get('from_date')
     to_date = request.args.get('to_date')
 
-    query = LedgerEntry.query.filter(LedgerEntry.person_id == person_id)
+    filters = _ledger_filters(person_id, vc_id, from_date, to_date)
 
-    if vc_id:
-        query = query.filter(LedgerEntry.vc_id == vc_id)
-
-    if from_date:
-        query = query.filter(
-            LedgerEntry.date >= datetime.strptime(from_date + ' 00:00:00', '%Y-%m-%d %H:%M:%S')
-        )
-
-    if to_date:
-        query = query.filter(
-            LedgerEntry.date <= datetime.strptime(to_date + ' 23:59:59', '%Y-%m-%d %H:%M:%S')
-        )
-
-    # UI order (latest first)
-    entries = query.order_by(LedgerEntry.id.desc()).all()
+    # UI order (latest first) — first page only, the rest is loaded on scroll
+    entries, next_before_id = _ledger_page(filters)
+    totals = _ledger_totals(filters)
 
     # 🔥 THIS is the only balance you care about
     current_balance = get_last_balance(person_id)
 
+    # Opening balance of the statement period (checkpoint + rows after it)
+    if from_date:
+        opening_balance = balance_as_of(
+            person_id, datetime.strptime(from_date, '%Y-%m-%d'), vc_id=vc_id
+        )
+    else:
+        opening_balance = float(person.opening_balance or 0.0)
+
     return render_template(
         'ledger/person.html',
         person=person,
         entries=entries,
-        opening_balance=float(person.opening_balance or 0.0),
+        next_before_id=next_before_id,
+        totals=totals,
+        opening_balance=opening_balance,
         current_balance=current_balance
     )
 
+@ledger_bp.route('/<int:person_id>/rows')
+@login_required
+def person_ledger_rows(person_id):
+    """Next batch of ledger rows (HTML) for infinite scroll."""
+    Person.query.filter_by(id=person_id, user_id=current_user.id).first_or_404()
+
+    filters = _ledger_filters(
+        person_id,
+        request.args.get('vc_id', type=int),
+        request.args.get('from_date'),
+        request.args.get('to_date')
+    )
+    entries, next_before_id = _ledger_page(filters, request.args.get('before_id', type=int))
+
+    response = make_response(render_template('ledger/entry_rows_partial.html', entries=entries))
+    response.headers['X-Next-Before-Id'] = str(next_before_id or '')
+    return response
+
 @ledger_bp.route('/create', methods=['GET', 'POST'])
 @login_required
 def create_ledger_entry():
@@ -119,7 +189,8 @@ def create_ledger_entry():
             narration=form.narration.data,
             debit=form.debit.data or 0,
             credit=form.credit.data or 0,
-            balance=float(prev_balance) + float(form.credit.data or 0) - float(form.debit.data or 0)
+            balance=float(prev_balance) + float(form.credit.data or 0) - float(form.debit.data or 0),
+            entry_kind=LedgerEntryKind.MANUAL
         )
         
         db.session.add(entry)
@@ -131,16 +202,8 @@ def create_ledger_entry():
     return render_template('ledger/create.html', form=form)
 
 
-@ledger_bp.route('/<int:person_id>/pdf')
-@login_required
-def export_ledger_pdf(person_id):
-    """Export ledger as PDF"""
-    person = Person.query.filter_by(id=person_id, user_id=current_user.id).first_or_404()
-
-    vc_id     = request.args.get('vc_id', type=int)
-    from_date = request.args.get('from_date')
-    to_date   = request.args.get('to_date')
-
+def _statement_entries(person_id, vc_id=None, from_date=None, to_date=None):
+    """Entries for a statement export, latest first."""
     query = LedgerEntry.query.filter_by(person_id=person_id)
 
     if vc_id:
@@ -150,27 +213,181 @@ def export_ledger_pdf(person_id):
     if to_date:
         query = query.filter(LedgerEntry.date <= datetime.strptime(to_date + ' 23:59:59', '%Y-%m-%d %H:%M:%S'))
 
-    entries = query.order_by(LedgerEntry.date.desc()).all()
+    return query.order_by(LedgerEntry.date.desc()).all()
 
-    rendered_html = render_template(
+def render_statement_html(person, vc_id=None, from_date=None, to_date=None, now=None):
+    """Render a person's ledger statement (ledger/pdf_template.html) to HTML."""
+    return render_template(
         'ledger/pdf_template.html',
         person=person,
-        entries=entries,
-        now=datetime.now()
+        entries=_statement_entries(person.id, vc_id, from_date, to_date),
+        closing_balance=_statement_closing_balance(person.id, to_date),
+        now=now
     )
 
-    pdf_bytes = HTML(string=rendered_html).write_pdf()
-    pdf_stream = BytesIO(pdf_bytes)
-    pdf_stream.seek(0)
+def render_statement_pdf(person, vc_id=None, from_date=None, to_date=None, now=None):
+    """Render a person's ledger statement to PDF bytes."""
+    rendered_html = render_statement_html(person, vc_id, from_date, to_date, now)
+    return HTML(string=rendered_html).write_pdf()
+
+def pdf_to_jpeg(pdf_bytes):
+    """JPEG bytes of the first page of a PDF."""
+    images = convert_from_bytes(pdf_bytes, fmt='jpeg', single_file=True, poppler_path='/opt/homebrew/bin')
+    if not images:
+        raise Exception('No image generated from PDF')
+    jpeg_stream = BytesIO()
+    images[0].save(jpeg_stream, format='JPEG', quality=95)
+    return jpeg_stream.getvalue()
+
+def render_statement_jpeg(person, vc_id=None, from_date=None, to_date=None):
+    """Render the first page of a person's ledger statement to JPEG bytes."""
+    return pdf_to_jpeg(render_statement_pdf(person, vc_id, from_date, to_date))
+
+
+@ledger_bp.route('/<int:person_id>/pdf')
+@login_required
+def export_ledger_pdf(person_id):
+    """Export ledger as PDF"""
+    person = Person.query.filter_by(id=person_id, user_id=current_user.id).first_or_404()
+
+    vc_id     = request.args.get('vc_id', type=int)
+    from_date = request.args.get('from_date')
+    to_date   = request.args.get('to_date')
+
+    # Served from the export cache unless the ledger or template changed
+    key = export_key('pdf', person, {'vc_id': vc_id, 'from_date': from_date, 'to_date': to_date})
+    path = cached_export(key, 'pdf')
+    if path is None:
+        pdf_bytes = render_statement_pdf(person, vc_id, from_date, to_date, now=datetime.now())
+        path = store_export(key, 'pdf', pdf_bytes)
 
     return send_file(
-        pdf_stream,
+        path,
         mimetype='application/pdf',
         as_attachment=True,
         download_name=f"ledger_{person.name.replace(' ', '_')}.pdf"
     )
 
 
+@ledger_bp.route('/statements/export-jobs', methods=['POST'])
+@login_required
+def create_statements_job():
+    """Queue every person's ledger PDF for a period as one ZIP; returns the job id"""
+    data = request.get_json(silent=True) or request.form
+    try:
+        from_date, to_date = parse_period(f"{data.get('from_date') or ''}:{data.get('to_date') or ''}")
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid statement period'}), 400
+
+    job = enqueue_statements(current_user.id, {'from_date': from_date, 'to_date': to_date})
+
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('ledger.export_job_status', job_id=job.id),
+    }), 202
+
+@ledger_bp.route('/<int:person_id>/export-jobs', methods=['POST'])
+@login_required
+def create_export_job(person_id):
+    """Queue a PDF/image export for `flask export-worker`; returns the job id"""
+    person = Person.query.filter_by(id=person_id, user_id=current_user.id).first_or_404()
+    data = request.get_json(silent=True) or request.form
+
+    kind = data.get('kind') or 'pdf'
+    if kind not in EXPORT_KINDS:
+        return jsonify({'success': False, 'error': 'kind must be pdf or jpeg'}), 400
+
+    try:
+        vc_id = int(data['vc_id']) if data.get('vc_id') else None
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'vc_id must be an integer'}), 400
+
+    filters = {
+        'vc_id': vc_id,
+        'from_date': data.get('from_date') or None,
+        'to_date': data.get('to_date') or None,
+    }
+    job = enqueue_export(current_user.id, person, kind, filters)
+
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('ledger.export_job_status', job_id=job.id),
+    }), 202
+
+@ledger_bp.route('/export-jobs/<int:job_id>')
+@login_required
+def export_job_status(job_id):
+    job = ExportJob.query.filter_by(id=job_id, user_id=current_user.id).first_or_404()
+    payload = job.to_dict()
+    if job.status == 'done':
+        payload['download_url'] = url_for('ledger.download_export_job', job_id=job.id)
+    return jsonify(payload)
+
+@ledger_bp.route('/export-jobs/<int:job_id>/download')
+@login_required
+def download_export_job(job_id):
+    job = ExportJob.query.filter_by(id=job_id, user_id=current_user.id).first_or_404()
+    if job.status != 'done' or not job.result_path or not os.path.exists(job.result_path):
+        # Not finished yet, or the file has since been evicted from the cache
+        return jsonify({'success': False, 'error': 'Export not available', 'status': job.status}), 409
+
+    if job.kind == STATEMENTS_KIND:
+        filters = job.filters
+        period = f"{filters.get('from_date') or 'start'}_to_{filters.get('to_date') or 'today'}"
+        return send_file(
+            job.result_path,
+            mimetype='application/zip',
+            as_attachment=True,
+            download_name=f"statements_{period}.zip"
+        )
+
+    ext = EXPORT_KINDS[job.kind]
+    return send_file(
+        job.result_path,
+        mimetype='application/pdf' if ext == 'pdf' else 'image/jpeg',
+        as_attachment=True,
+        download_name=f"ledger_{job.person.name.replace(' ', '_')}.{ext}"
+    )
+
+
+@ledger_bp.route('/<int:person_id>/csv')
+@login_required
+def export_ledger_csv(person_id):
+    """Export ledger as CSV, streamed oldest first"""
+    person = Person.query.filter_by(id=person_id, user_id=current_user.id).first_or_404()
+
+    filters = _ledger_filters(
+        person_id,
+        request.args.get('vc_id', type=int),
+        request.args.get('from_date'),
+        request.args.get('to_date')
+    )
+
+    statement = (
+        select(LedgerEntry.date, VC.name, LedgerEntry.narration,
+               LedgerEntry.debit, LedgerEntry.credit, LedgerEntry.balance)
+        .select_from(LedgerEntry)
+        .outerjoin(VC, VC.id == LedgerEntry.vc_id)
+        .where(*filters)
+        .order_by(LedgerEntry.date.asc(), LedgerEntry.id.asc())
+    )
+
+    rows = (
+        (format_date(r[0]), r[1] or '', r[2] or '',
+         format_amount(r[3]), format_amount(r[4]), format_amount(r[5]))
+        for r in stream_rows(statement)
+    )
+    return csv_response(
+        f"ledger_{person.name.replace(' ', '_')}.csv",
+        ['Date', 'VC', 'Narration', 'Debit', 'Credit', 'Balance'],
+        rows
+    )
+
+
 @ledger_bp.route('/<int:person_id>/image')
 @login_required
 def export_ledger_image(person_id):
@@ -181,37 +398,14 @@ def export_ledger_image(person_id):
     from_date = request.args.get('from_date')
     to_date   = request.args.get('to_date')
 
-    query = LedgerEntry.query.filter_by(person_id=person_id)
-
-    if vc_id:
-        query = query.filter(LedgerEntry.vc_id == vc_id)
-    if from_date:
-        query = query.filter(LedgerEntry.date >= datetime.strptime(from_date + ' 00:00:00', '%Y-%m-%d %H:%M:%S'))
-    if to_date:
-        query = query.filter(LedgerEntry.date <= datetime.strptime(to_date + ' 23:59:59', '%Y-%m-%d %H:%M:%S'))
-
-    entries = query.order_by(LedgerEntry.date.desc()).all()
-
-    # Generate HTML
-    rendered_html = render_template(
-        'ledger/pdf_template.html',
-        person=person,
-        entries=entries
-    )
-
     try:
-        # Generate PDF from HTML
-        pdf_bytes = HTML(string=rendered_html).write_pdf()
-        # Convert first page of PDF to image (JPEG)
-        images = convert_from_bytes(pdf_bytes, fmt='jpeg', single_file=True, poppler_path='/opt/homebrew/bin')
-        if not images:
-            raise Exception('No image generated from PDF')
-        img = images[0]
-        jpeg_stream = BytesIO()
-        img.save(jpeg_stream, format='JPEG', quality=95)
-        jpeg_stream.seek(0)
+        key = export_key('jpeg', person, {'vc_id': vc_id, 'from_date': from_date, 'to_date': to_date})
+        path = cached_export(key, 'jpg')
+        if path is None:
+            path = store_export(key, 'jpg', render_statement_jpeg(person, vc_id, from_date, to_date))
+
         return send_file(
-            jpeg_stream,
+            path,
             mimetype='image/jpeg',
             as_attachment=True,
             download_name=f"ledger_{person.name.replace(' ', '_')}.jpg"
@@ -228,10 +422,11 @@ def clear_ledger(person_id):
     person = Person.query.filter_by(id=person_id, user_id=current_user.id).first_or_404()
     
     try:
-        entries = LedgerEntry.query.filter_by(person_id=person_id).all()
-        for entry in entries:
-            db.session.delete(entry)
-            db.session.commit()
+        # One DELETE for the whole ledger; the bulk statement skips the flush
+        # hooks, so refresh the cached balance and checkpoints here.
+        LedgerEntry.query.filter_by(person_id=person_id).delete(synchronize_session=False)
+        sync_person_balances([person_id])
+        invalidate_checkpoints({person_id: datetime.min})
         person.opening_balance = 0
         db.session.commit()
         flash(f'Ledger cleared successfully! Balance and opening balance have been reset to ₹0.', 'success')
@@ -241,6 +436,95 @@ def clear_ledger(person_id):
     return redirect(url_for('ledger.person_ledger', person_id=person_id))
 
 
+def _operator_filters(user_id, vc_id, from_date, to_date):
+    """WHERE clauses for the operator rows of a user's VCs."""
+    filters = [
+        LedgerEntry.person_id.is_(None),
+        LedgerEntry.vc_id.in_(select(VC.id).where(VC.user_id == user_id)),
+    ]
+
+    if vc_id:
+        filters.append(LedgerEntry.vc_id == vc_id)
+    if from_date:
+        filters.append(LedgerEntry.date >= datetime.strptime(from_date + ' 00:00:00', '%Y-%m-%d %H:%M:%S'))
+    if to_date:
+        filters.append(LedgerEntry.date <= datetime.strptime(to_date + ' 23:59:59', '%Y-%m-%d %H:%M:%S'))
+
+    return filters
+
+def _month_bucket(column):
+    """'YYYY-MM' of a datetime column, in the current database's dialect."""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return func.strftime('%Y-%m', column)
+    return func.date_format(column, '%Y-%m')
+
+def _operator_rollup_query(filters):
+    month = _month_bucket(LedgerEntry.date).label('month')
+    return (
+        select(
+            LedgerEntry.vc_id,
+            month,
+            func.count(LedgerEntry.id),
+            func.coalesce(func.sum(LedgerEntry.credit), 0),
+            func.coalesce(func.sum(LedgerEntry.debit), 0)
+        )
+        .where(*filters)
+        .group_by(LedgerEntry.vc_id, month)
+    )
+
+def _operator_rollup(filters):
+    """
+    Credits, debits and row counts of the filtered operator rows, grouped
+    by VC and month in one query.  Returns (totals, by_vc, by_month).
+    """
+    rows = db.session.execute(_operator_rollup_query(filters)).all()
+
+    totals = {'count': 0, 'credit': 0.0, 'debit': 0.0}
+    by_vc, by_month = {}, {}
+    for vc_id, bucket, count, credit, debit in rows:
+        for group in (totals,
+                      by_vc.setdefault(vc_id, {'count': 0, 'credit': 0.0, 'debit': 0.0}),
+                      by_month.setdefault(bucket, {'count': 0, 'credit': 0.0, 'debit': 0.0})):
+            group['count'] += count
+            group['credit'] += float(credit)
+            group['debit'] += float(debit)
+
+    by_month = [
+        dict(values, month=datetime.strptime(bucket, '%Y-%m'))
+        for bucket, values in sorted(by_month.items(), reverse=True)
+    ]
+    return totals, by_vc, by_month
+
+def _operator_page_query(filters, before_date=None, before_id=None):
+    """Operator rows latest first, after the cursor: one page plus one row."""
+    query = LedgerEntry.query.filter(*filters)
+    if before_date is not None and before_id is not None:
+        query = query.filter(or_(
+            LedgerEntry.date < before_date,
+            and_(LedgerEntry.date == before_date, LedgerEntry.id < before_id)
+        ))
+    return query.order_by(LedgerEntry.date.desc(), LedgerEntry.id.desc()).limit(LEDGER_PAGE_SIZE + 1)
+
+def _operator_page(filters, before_date=None, before_id=None):
+    """
+    One page of operator rows, latest first, strictly after the cursor
+    (before_date, before_id) in that order.  Returns (entries, next_cursor).
+    """
+    entries = _operator_page_query(filters, before_date, before_id).all()
+    if len(entries) > LEDGER_PAGE_SIZE:
+        entries = entries[:LEDGER_PAGE_SIZE]
+        last = entries[-1]
+        return entries, f'{last.date.isoformat()}|{last.id}'
+    return entries, None
+
+def _operator_cursor():
+    """(before_date, before_id) from ?cursor=<iso date>|<id>, or (None, None)."""
+    try:
+        before_date, before_id = request.args.get('cursor', '').split('|')
+        return datetime.fromisoformat(before_date), int(before_id)
+    except ValueError:
+        return None, None
+
 @ledger_bp.route('/operator')
 @login_required
 def operator_ledger():
@@ -248,41 +532,74 @@ def operator_ledger():
     to_date   = request.args.get('to_date')
     vc_id     = request.args.get('vc_id', type=int)
 
-    # Get all VC ids belonging to current user
-    user_vc_ids = [v.id for v in VC.query.filter_by(user_id=current_user.id).all()]
-    if not user_vc_ids:
-        return render_template('ledger/operator.html', entries=[], vcs=[], 
-                          total_credits=0, total_debits=0, net_balance=0)
-
-    # Use is_(None) for reliable NULL comparison in SQLAlchemy
-    query = LedgerEntry.query.filter(
-        LedgerEntry.person_id.is_(None),
-        LedgerEntry.vc_id.in_(user_vc_ids)
-    )
-
-    if vc_id:
-        query = query.filter(LedgerEntry.vc_id == vc_id)
-    if from_date:
-        query = query.filter(LedgerEntry.date >= datetime.strptime(from_date + ' 00:00:00', '%Y-%m-%d %H:%M:%S'))
-    if to_date:
-        query = query.filter(LedgerEntry.date <= datetime.strptime(to_date + ' 23:59:59', '%Y-%m-%d %H:%M:%S'))
-
-    entries = query.order_by(LedgerEntry.date.desc()).all()
-    entries = [e for e in entries if e is not None] 
+    filters = _operator_filters(current_user.id, vc_id, from_date, to_date)
+    entries, next_cursor = _operator_page(filters)
+    totals, by_vc, by_month = _operator_rollup(filters)
 
     vcs = VC.query.filter_by(user_id=current_user.id).order_by(VC.vc_number).all()
-
-    total_credits = sum(float(e.credit or 0) for e in entries)
-    total_debits  = sum(float(e.debit  or 0) for e in entries)
-    net_balance   = total_credits - total_debits
+    vc_names = {vc.id: vc.name for vc in vcs}
 
     return render_template(
         'ledger/operator.html',
         entries=entries,
+        next_cursor=next_cursor,
         vcs=vcs,
-        total_credits=total_credits,
-        total_debits=total_debits,
-        net_balance=net_balance,
+        vc_names=vc_names,
+        total_credits=totals['credit'],
+        total_debits=totals['debit'],
+        net_balance=totals['credit'] - totals['debit'],
+        entry_count=totals['count'],
+        by_vc=[dict(by_vc[vc.id], name=vc.name) for vc in vcs if vc.id in by_vc],
+        by_month=by_month,
+    )
+
+@ledger_bp.route('/operator/rows')
+@login_required
+def operator_ledger_rows():
+    """Next batch of operator rows (HTML) for the "Load older" button."""
+    filters = _operator_filters(
+        current_user.id,
+        request.args.get('vc_id', type=int),
+        request.args.get('from_date'),
+        request.args.get('to_date')
+    )
+    entries, next_cursor = _operator_page(filters, *_operator_cursor())
+    vc_names = dict(
+        db.session.query(VC.id, VC.name).filter(VC.user_id == current_user.id).all()
+    )
+
+    response = make_response(render_template(
+        'ledger/operator_rows_partial.html', entries=entries, vc_names=vc_names
+    ))
+    response.headers['X-Next-Cursor'] = next_cursor or ''
+    return response
+
+@ledger_bp.route('/operator/csv')
+@login_required
+def export_operator_csv():
+    """Export the operator ledger as CSV, streamed oldest first"""
+    from_date = request.args.get('from_date')
+    to_date   = request.args.get('to_date')
+    vc_id     = request.args.get('vc_id', type=int)
+
+    statement = (
+        select(LedgerEntry.date, VC.name, LedgerEntry.narration,
+               LedgerEntry.debit, LedgerEntry.credit, LedgerEntry.balance)
+        .select_from(LedgerEntry)
+        .join(VC, VC.id == LedgerEntry.vc_id)
+        .where(*_operator_filters(current_user.id, vc_id, from_date, to_date))
+        .order_by(LedgerEntry.date.asc(), LedgerEntry.id.asc())
+    )
+
+    rows = (
+        (format_date(r[0]), r[1] or '', r[2] or '',
+         format_amount(r[3]), format_amount(r[4]), format_amount(r[5]))
+        for r in stream_rows(statement)
+    )
+    return csv_response(
+        'operator_ledger.csv',
+        ['Date', 'VC', 'Narration', 'Debit', 'Credit', 'Balance'],
+        rows
     )
 
 @ledger_bp.route('/entry/<int:entry_id>/edit', methods=['POST'])
@@ -304,8 +621,8 @@ def edit_entry(entry_id):
 
         db.session.commit()
 
-        # 🔥 recalc after edit
-        recalculate_balances(entry.person_id)
+        # 🔥 recalc after edit — only this entry and the rows after it
+        recalculate_balances(entry.person_id, entry.date, entry.id)
 
         return {"success": True}
 
@@ -324,13 +641,14 @@ def delete_entry(entry_id):
     ).first_or_404()
 
     person_id = entry.person_id
+    entry_date, entry_id = entry.date, entry.id
 
     try:
         db.session.delete(entry)
         db.session.commit()
 
-        # 🔥 recalc after delete
-        recalculate_balances(person_id)
+        # 🔥 recalc after delete — only the rows after the removed one
+        recalculate_balances(person_id, entry_date, entry_id)
 
         return {"success": True}
 
@@ -8,7 +8,7 @@ from app.models.person import Person
 from app.models.contribution import Contribution
 from app.models.payment import Payment
 from app.models.ledger import LedgerEntry
-from app.models.enums import PaymentStatus
+from app.models.enums import PaymentStatus, LedgerEntryKind
 from app.forms import PaymentForm
 
 payment_bp = Blueprint('payment', __name__, url_prefix='/payment')
@@ -36,17 +36,22 @@ def record_payment():
     selected_vc = VC.query.get(selected_vc_id) if selected_vc_id else None
     selected_hand = VCHand.query.get(selected_hand_id) if selected_hand_id else None
     if selected_vc and selected_hand:
+        # Cash payouts already recorded for this hand, per person
+        payout_counts = dict(
+            db.session.query(LedgerEntry.person_id, db.func.count(LedgerEntry.id))
+            .filter(
+                LedgerEntry.vc_id == selected_vc.id,
+                LedgerEntry.hand_id == selected_hand.id,
+                LedgerEntry.entry_kind == LedgerEntryKind.PAYOUT_CASH
+            )
+            .group_by(LedgerEntry.person_id)
+            .all()
+        )
         for member in selected_vc.members:
             if member.user_id != current_user.id:
                 continue
             slots = selected_vc.get_slots(member.id)
-            narration_like = f"{selected_vc.name} Haath {selected_hand.hand_number} mai aapko diye%"
-            ledger_entries = LedgerEntry.query.filter(
-                LedgerEntry.person_id == member.id,
-                LedgerEntry.vc_id == selected_vc.id,
-                LedgerEntry.narration.like(narration_like)
-            ).count()
-            if ledger_entries < slots:
+            if payout_counts.get(member.id, 0) < slots:
                 all_members[member.id] = member
 
     # Initialize hand and person choices for form validation
@@ -91,11 +96,13 @@ def record_payment():
         ledger_entry = LedgerEntry(
             person_id=person.id,
             vc_id=vc.id,
+            hand_id=hand.id,
             date=form.date.data,
             narration=payment.narration,
             debit=0,
             credit=payment.amount,
-            balance=current_balance + payment.amount
+            balance=current_balance + payment.amount,
+            entry_kind=LedgerEntryKind.PAYMENT
         )
         db.session.add(ledger_entry)
         # Mark any matching Contribution records for this hand/person as paid
@@ -167,11 +174,13 @@ def create_payment():
         ledger_entry = LedgerEntry(
             person_id=form.person_id.data,
             vc_id=form.vc_id.data,
+            hand_id=hand.id,
             date=form.date.data or datetime.utcnow(),
             narration=f"{vc.name} Haath {hand.hand_number}: {form.narration.data}",
             debit=0,
             credit=form.amount.data,
-            balance=prev_balance + form.amount.data
+            balance=prev_balance + form.amount.data,
+            entry_kind=LedgerEntryKind.PAYMENT
         )
         db.session.add(ledger_entry)
 
@@ -240,11 +249,13 @@ def record_payout_payment():
     ledger_entry = LedgerEntry(
         person_id=person_id,
         vc_id=vc_id,
+        hand_id=hand_id,
         date=pay_date,
         narration=narration or f"{vc.name} Haath {hand.hand_number} mai aapko diye",
         credit=0,  # CREDIT in ledger (person receives money)
         debit=amount,
-        balance=prev_balance + amount
+        balance=prev_balance + amount,
+        entry_kind=LedgerEntryKind.PAYOUT_CASH
     )
     db.session.add(ledger_entry)
 
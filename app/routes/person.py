@@ -3,12 +3,15 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import current_user, login_required
 from datetime import datetime
-from sqlalchemy import or_, cast, String, func
+from sqlalchemy import delete
 from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models.person import Person
-from app.models.ledger import LedgerEntry
+from app.models.person_balance import PersonBalance
+from app.models.contribution import Contribution
+from app.models.vc import HandDistribution, vc_members
 from app.forms import PersonForm
+from app.search import person_search_filter
 
 person_bp = Blueprint('person', __name__, url_prefix='/person')
 
@@ -17,39 +20,15 @@ person_bp = Blueprint('person', __name__, url_prefix='/person')
 @login_required
 def persons():
 
-    # ── Subquery: latest ledger id per person ──
-    latest_id_subq = (
-        db.session.query(
-            LedgerEntry.person_id,
-            func.max(LedgerEntry.id).label('max_id')
-        )
-        .group_by(LedgerEntry.person_id)
-        .subquery()
-    )
-
-    # ── Get balance of that latest id ──
-    latest_balance_subq = (
-        db.session.query(
-            LedgerEntry.person_id,
-            LedgerEntry.balance.label('latest_balance')
-        )
-        .join(
-            latest_id_subq,
-            (LedgerEntry.person_id == latest_id_subq.c.person_id) &
-            (LedgerEntry.id == latest_id_subq.c.max_id)
-        )
-        .subquery()
-    )
-
-    # ── Main query ──
+    # ── Latest balance comes from the materialized person_balances row ──
     results = (
         db.session.query(
             Person,
-            latest_balance_subq.c.latest_balance
+            PersonBalance.current_balance
         )
         .outerjoin(
-            latest_balance_subq,
-            Person.id == latest_balance_subq.c.person_id
+            PersonBalance,
+            Person.id == PersonBalance.person_id
         )
         .filter(Person.user_id == current_user.id)
         .order_by(Person.name.asc())
@@ -70,61 +49,20 @@ def search_persons():
     query = request.args.get('q', '').strip()
     sort_order = request.args.get('sort', 'name_asc')
 
-    # ── Subquery: latest entry by MAX(id) ──
-    latest_id_subq = (
-        db.session.query(
-            LedgerEntry.person_id,
-            func.max(LedgerEntry.id).label('max_id')
-        )
-        .group_by(LedgerEntry.person_id)
-        .subquery()
-    )
-
-    latest_balance_subq = (
-        db.session.query(
-            LedgerEntry.person_id,
-            LedgerEntry.balance.label('latest_balance')
-        )
-        .join(
-            latest_id_subq,
-            (LedgerEntry.person_id == latest_id_subq.c.person_id) &
-            (LedgerEntry.id == latest_id_subq.c.max_id)
-        )
-        .subquery()
-    )
-
     # ── MAIN QUERY (IMPORTANT: apply user filter here) ──
     q = db.session.query(
         Person,
-        latest_balance_subq.c.latest_balance
+        PersonBalance.current_balance
     ).outerjoin(
-        latest_balance_subq,
-        Person.id == latest_balance_subq.c.person_id
+        PersonBalance,
+        Person.id == PersonBalance.person_id
     ).filter(
         Person.user_id == current_user.id   # ✅ THIS WAS MISSING
     )
 
-    # ── Search filter ──
+    # ── Search filter (FTS5 on SQLite, amounts by range) ──
     if query:
-        ledger_exists = db.session.query(LedgerEntry.id).filter(
-            LedgerEntry.person_id == Person.id,
-            or_(
-                LedgerEntry.narration.ilike(f'%{query}%'),
-                cast(LedgerEntry.debit, String).ilike(f'%{query}%'),
-                cast(LedgerEntry.credit, String).ilike(f'%{query}%'),
-                cast(LedgerEntry.balance, String).ilike(f'%{query}%')
-            )
-        ).exists()
-
-        person_match = or_(
-            Person.name.ilike(f'%{query}%'),
-            Person.short_name.ilike(f'%{query}%'),
-            Person.phone.ilike(f'%{query}%'),
-            Person.phone2.ilike(f'%{query}%'),
-            cast(Person.opening_balance, String).ilike(f'%{query}%')
-        )
-
-        q = q.filter(or_(person_match, ledger_exists))
+        q = q.filter(person_search_filter(query))
 
     # ── Sorting ──
     if sort_order == 'name_asc':
@@ -132,13 +70,13 @@ def search_persons():
 
     elif sort_order == 'balance_asc':
         q = q.order_by(
-            latest_balance_subq.c.latest_balance.asc().nulls_last(),
+            PersonBalance.current_balance.asc().nulls_last(),
             Person.name.asc()
         )
 
     elif sort_order == 'balance_desc':
         q = q.order_by(
-            latest_balance_subq.c.latest_balance.desc().nulls_last(),
+            PersonBalance.current_balance.desc().nulls_last(),
             Person.name.asc()
         )
 
@@ -248,7 +186,18 @@ def delete_person(id):
     person = Person.query.filter_by(id=id, user_id=current_user.id).first_or_404()
 
     try:
-        db.session.delete(person)
+        # Contributions and hand distributions keep their history without the person
+        Contribution.query.filter_by(person_id=person.id).update(
+            {'person_id': None}, synchronize_session=False
+        )
+        HandDistribution.query.filter_by(person_id=person.id).update(
+            {'person_id': None}, synchronize_session=False
+        )
+        db.session.execute(delete(vc_members).where(vc_members.c.person_id == person.id))
+
+        # Ledger entries, transactions, payments, cached balance and checkpoints
+        # go with the person through ON DELETE CASCADE
+        Person.query.filter_by(id=person.id).delete(synchronize_session=False)
         db.session.commit()
         flash('Person deleted successfully!', 'success')
 
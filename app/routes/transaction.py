@@ -1,47 +1,93 @@
 """Transactions routes - Recent Transactions page"""
 from flask import Blueprint, render_template, request
 from flask_login import current_user, login_required
-from datetime import datetime
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, case, extract, or_, and_
+from sqlalchemy.orm import contains_eager
 from app import db
+from app.search import amount_range
+from app.exports import stream_rows, csv_response, format_date, format_amount
 from app.models.transaction import Transaction
 from app.models.person import Person
 from app.models.vc import VC
 
 transactions_bp = Blueprint('transactions', __name__, url_prefix='/transactions')
 
+FIRST_PAGE_SIZE = 15
+PAGE_SIZE = 10
 
-@transactions_bp.route('/transactions')
-@login_required
-def recent_transactions():
-    """Show recent transactions (received/paid entries) for current user"""
+# Date-like search terms and the span of time each one covers
+_SEARCH_DATE_FORMATS = [
+    ('%Y-%m-%d', 'day'), ('%d/%m/%Y', 'day'), ('%d-%m-%Y', 'day'), ('%d.%m.%Y', 'day'),
+    ('%Y-%m', 'month'), ('%m/%Y', 'month'), ('%Y', 'year'),
+]
 
-    # Pagination: 15 on first page, 10 on subsequent
-    page = request.args.get('page', 1, type=int)
-    per_page = 15 if page == 1 else 10
 
-    # Filters
+def _search_date_range(term):
+    """[start, end) covered by a date-like search term, or None."""
+    for fmt, span in _SEARCH_DATE_FORMATS:
+        try:
+            start = datetime.strptime(term, fmt)
+        except ValueError:
+            continue
+        if span == 'year':
+            return start, start.replace(year=start.year + 1)
+        if span == 'month':
+            return start, (start + timedelta(days=32)).replace(day=1)
+        return start, start + timedelta(days=1)
+
+    # dd/mm as shown in the table: the most recent such day
+    match = re.fullmatch(r'(\d{1,2})[/-](\d{1,2})', term)
+    if match:
+        today = datetime.now()
+        for year in (today.year, today.year - 1):
+            try:
+                start = datetime(year, int(match[2]), int(match[1]))
+            except ValueError:
+                continue
+            if start <= today:
+                return start, start + timedelta(days=1)
+    return None
+
+
+def _search_condition(search):
+    """OR of everything a search term can match; dates and amounts as ranges."""
+    search_like = f"%{search}%"
+    conditions = [
+        Transaction.narration.ilike(search_like),
+        Person.name.ilike(search_like),
+        Person.short_name.ilike(search_like),
+    ]
+
+    amount = amount_range(search)
+    if amount is not None:
+        conditions.append(Transaction.amount.between(*amount))
+
+    date_range = _search_date_range(search)
+    if date_range is not None:
+        conditions.append(and_(Transaction.date >= date_range[0], Transaction.date < date_range[1]))
+
+    time_match = re.fullmatch(r'(\d{1,2}):(\d{2})', search)
+    if time_match:
+        conditions.append(and_(
+            extract('hour', Transaction.date) == int(time_match[1]),
+            extract('minute', Transaction.date) == int(time_match[2]),
+        ))
+
+    return or_(*conditions)
+
+
+def _filtered_transactions(query):
+    """Apply the page's search/type/date filters to a Transaction query joined to Person."""
     txn_type = request.args.get('type', '')   # 'received' or 'paid'
     from_date = request.args.get('from_date', '')
     to_date = request.args.get('to_date', '')
 
-    # Base query — current user only
-    query = Transaction.query.filter_by(user_id=current_user.id)
-
     # Search filter
     search = request.args.get('search', '').strip()
     if search:
-        from sqlalchemy import or_, cast, String
-        search_like = f"%{search}%"
-        query = query.join(Transaction.person)
-        query = query.filter(
-            or_(
-                cast(Transaction.amount, String).ilike(search_like),
-                Transaction.narration.ilike(search_like),
-                cast(Transaction.date, String).ilike(search_like),
-                Person.name.ilike(search_like),
-                Person.short_name.ilike(search_like)
-            )
-        )
+        query = query.filter(_search_condition(search))
 
     # Type filter  ('received' maps to type='credit', 'paid' maps to type='debit')
     if txn_type == 'received':
@@ -64,20 +110,104 @@ def recent_transactions():
         except ValueError:
             pass
 
-    # Totals across all matching rows (before pagination)
-    all_txns = query.all()
-    total_received = sum(t.amount for t in all_txns if t.type == 'credit')
-    total_paid = sum(t.amount for t in all_txns if t.type == 'debit')
+    return query
+
+
+def _transaction_totals(query):
+    """(row count, total received, total paid) for the filtered query in one SELECT."""
+    count, received, paid = query.with_entities(
+        func.count(Transaction.id),
+        func.coalesce(func.sum(case((Transaction.type == 'credit', Transaction.amount), else_=0)), 0),
+        func.coalesce(func.sum(case((Transaction.type == 'debit', Transaction.amount), else_=0)), 0),
+    ).order_by(None).one()
+    return count, float(received), float(paid)
+
+
+def _page_size(page):
+    return FIRST_PAGE_SIZE if page == 1 else PAGE_SIZE
+
+
+def _parse_cursor(value):
+    """(date, id) from '<iso date>|<id>', or None."""
+    try:
+        cursor_date, cursor_id = value.split('|')
+        return datetime.fromisoformat(cursor_date), int(cursor_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _cursor(txn):
+    return f'{txn.date.isoformat()}|{txn.id}'
 
-    # Order and paginate
-    paginated = (
-        query.order_by(Transaction.date.desc())
-        .paginate(page=page, per_page=per_page, error_out=False)
+
+def _transactions_page_query(query, page):
+    """
+    Query for the rows of `page`.  Links carry the first/last row of the
+    page they came from (?after= / ?before=) plus a small ?skip= for jumps
+    of more than one page, so deep pages are keyset seeks rather than
+    large OFFSETs.  Without a cursor the page falls back to OFFSET.
+    """
+    per_page = _page_size(page)
+    skip = max(request.args.get('skip', 0, type=int), 0)
+    after = _parse_cursor(request.args.get('after'))
+    before = _parse_cursor(request.args.get('before'))
+
+    if after:
+        after_date, after_id = after
+        query = query.filter(or_(
+            Transaction.date < after_date,
+            and_(Transaction.date == after_date, Transaction.id < after_id)
+        )).order_by(Transaction.date.desc(), Transaction.id.desc())
+    elif before:
+        before_date, before_id = before
+        query = query.filter(or_(
+            Transaction.date > before_date,
+            and_(Transaction.date == before_date, Transaction.id > before_id)
+        )).order_by(Transaction.date.asc(), Transaction.id.asc())
+    else:
+        skip = 0 if page == 1 else FIRST_PAGE_SIZE + (page - 2) * PAGE_SIZE
+        query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+
+    return query.offset(skip).limit(per_page)
+
+
+def _transactions_page(query, page):
+    """Rows of `page`, latest first."""
+    rows = _transactions_page_query(query, page).all()
+    return rows[::-1] if _parse_cursor(request.args.get('before')) else rows
+
+
+def _page_link_args(page, target, rows):
+    """Query args that reach page `target` from the rows of `page`."""
+    if target == 1 or not rows:
+        return {'page': target}
+    if target > page:
+        return {'page': target, 'after': _cursor(rows[-1]), 'skip': (target - page - 1) * PAGE_SIZE}
+    return {'page': target, 'before': _cursor(rows[0]), 'skip': (page - target - 1) * PAGE_SIZE}
+
+
+@transactions_bp.route('/transactions')
+@login_required
+def recent_transactions():
+    """Show recent transactions (received/paid entries) for current user"""
+
+    # Pagination: 15 on first page, 10 on subsequent
+    page = max(request.args.get('page', 1, type=int), 1)
+
+    # Base query — current user only, filtered like the export
+    query = _filtered_transactions(
+        Transaction.query.filter_by(user_id=current_user.id).join(Transaction.person)
     )
 
+    # Count and totals across all matching rows in one round trip
+    total_count, total_received, total_paid = _transaction_totals(query)
+    pages = 1 if total_count <= FIRST_PAGE_SIZE else 2 + (total_count - FIRST_PAGE_SIZE - 1) // PAGE_SIZE
+
+    rows = _transactions_page(query.options(contains_eager(Transaction.person)), page)
+
     # Build display list
     transactions = []
-    for t in paginated.items:
+    for t in rows:
         transactions.append({
             'date': t.date,
             'short_name': t.person.short_name if t.person else 'Unknown',
@@ -87,6 +217,16 @@ def recent_transactions():
             'amount': t.amount,
         })
 
+    # Filters carried by the pagination links
+    filter_args = {
+        key: value for key, value in request.args.items()
+        if key not in ('page', 'after', 'before', 'skip') and value
+    }
+    page_links = {
+        target: dict(filter_args, **_page_link_args(page, target, rows))
+        for target in range(max(page - 2, 1), page + 3)
+    }
+
     all_vcs = VC.query.filter_by(user_id=current_user.id).all()
 
     return render_template(
@@ -95,6 +235,29 @@ def recent_transactions():
         all_vcs=all_vcs,
         total_received=total_received,
         total_paid=total_paid,
-        pages=paginated.pages,
-        page=page
-    )
\ No newline at end of file
+        pages=pages,
+        page=page,
+        page_links=page_links
+    )
+
+@transactions_bp.route('/csv')
+@login_required
+def export_transactions_csv():
+    """Export the filtered transactions as CSV, streamed oldest first"""
+    statement = _filtered_transactions(
+        select(Transaction.date, Person.short_name, Person.name,
+               Transaction.narration, Transaction.type, Transaction.amount)
+        .join(Person, Person.id == Transaction.person_id)
+        .where(Transaction.user_id == current_user.id)
+    ).order_by(Transaction.date.asc(), Transaction.id.asc())
+
+    rows = (
+        (format_date(r[0]), r[1], r[2], r[3] or '',
+         'Received' if r[4] == 'credit' else 'Paid', format_amount(r[5]))
+        for r in stream_rows(statement)
+    )
+    return csv_response(
+        'transactions.csv',
+        ['Date', 'Short Name', 'Person', 'Narration', 'Type', 'Amount'],
+        rows
+    )
@@ -10,10 +10,13 @@ from app.models.vc import VC, VCHand, HandDistribution, PaymentStatus, vc_member
 from app.models.payment import Payment
 from app.models.contribution import Contribution
 from app.models.ledger import LedgerEntry
+from app.models.enums import LedgerEntryKind
 from app.models.person import Person
 from app.forms import VCForm
 from app.routes import hand
 from app.routes.ledger import get_last_balance
+from app.vc_metrics import VCMetricsLoader
+from app.load_profiles import load_profile
 from app.utils import login_required
 import traceback
 import json
@@ -23,11 +26,18 @@ vc_bp = Blueprint('vc', __name__, url_prefix='/vc')
 @vc_bp.route('/')
 @login_required
 def vcs_list():
-    vcs = VC.query.filter_by(user_id=current_user.id, is_deleted=False).order_by(VC.vc_number).all()
+    vcs = (
+        VC.query.options(*load_profile('vc_list'))
+        .filter_by(user_id=current_user.id, is_deleted=False)
+        .order_by(VC.vc_number)
+        .all()
+    )
+    # Slots and unpaid dues for every VC in two grouped queries
+    metrics = VCMetricsLoader(vcs).load()
     # Total due = sum of all unpaid contributions globally (across all people)
-    total_due = sum(c.amount for vc in vcs for hand in vc.hands for c in hand.contributions if not c.paid)
+    total_due = metrics.total_due
     total_vcs = len(vcs)
-    total_members = sum(vc.total_slots for vc in vcs) if vcs else 0
+    total_members = metrics.total_slots
     return render_template('vc/list.html', vcs=vcs, total_due=total_due, total_members=total_members, total_vcs=total_vcs)
 
 
@@ -75,14 +85,7 @@ def create_vc():
             print(f"DEBUG person.id = {person.id!r}  type = {type(person.id)}  lookup = {slot_map.get(person.id, 'NOT FOUND')}")
             slots = slot_map.get(person.id, 1)
             slots = slot_map.get(person.id, 1)
-            db.session.execute(
-                vc_members.update()
-                .where(
-                    (vc_members.c.vc_id     == vc.id) &
-                    (vc_members.c.person_id == person.id)
-                )
-                .values(slots=slots)
-            )
+            vc.set_slots(person.id, slots)
 
         db.session.flush()
         vc.create_hands()
@@ -102,8 +105,12 @@ def create_vc():
 @vc_bp.route('/<int:id>')
 @login_required
 def view_vc(id):
-    vc = VC.query.filter_by(id=id, user_id=current_user.id).first_or_404()
-    hands = VCHand.query.filter_by(vc_id=id).order_by(VCHand.hand_number).all()
+    vc = (
+        VC.query.options(*load_profile('vc_overview'))
+        .filter_by(id=id, user_id=current_user.id)
+        .first_or_404()
+    )
+    hands = sorted(vc.hands, key=lambda h: h.hand_number)
     csrf_form = FlaskForm()
     return render_template('vc/view.html', vc=vc, hands=hands, form=csrf_form)
 
@@ -132,8 +139,7 @@ def edit_vc(id):
     # If start date changed, shift all hand dates by the same delta
     if new_start != vc.start_date.replace(hour=0, minute=0, second=0, microsecond=0):
         delta = new_start - vc.start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        for hand in vc.hands:
-            hand.date = hand.date + delta
+        vc.shift_hands(delta)
 
     vc.name       = name
     vc.start_date = new_start
@@ -149,7 +155,11 @@ def edit_vc(id):
 @vc_bp.route('/<int:vc_id>/hand/<int:hand_number>')
 @login_required
 def view_hand_distribution(vc_id, hand_number):
-    vc   = VC.query.filter_by(id=vc_id, user_id=current_user.id).first_or_404()
+    vc   = (
+        VC.query.options(*load_profile('hand_detail'))
+        .filter_by(id=vc_id, user_id=current_user.id)
+        .first_or_404()
+    )
     hand = VCHand.query.filter_by(vc_id=vc.id, hand_number=hand_number).first_or_404()
 
     vc_member_ids = [m.id for m in vc.members]
@@ -176,8 +186,14 @@ def view_hand_distribution(vc_id, hand_number):
 
     ledger_entries = LedgerEntry.query.filter(
         LedgerEntry.vc_id == vc.id,
-        LedgerEntry.narration.like(f'%{vc.name} Haath {hand.hand_number}%')
-    ).all()
+        LedgerEntry.hand_id == hand.id,
+        LedgerEntry.entry_kind.in_([
+            LedgerEntryKind.CONTRIBUTION,
+            LedgerEntryKind.PAYMENT,
+            LedgerEntryKind.PAYOUT_CREDIT,
+            LedgerEntryKind.PAYOUT_CASH,
+        ])
+    ).order_by(LedgerEntry.id).all()
 
     ledger_map = {}
     for entry in ledger_entries:
@@ -186,36 +202,18 @@ def view_hand_distribution(vc_id, hand_number):
 
     members = vc.members
 
-    # Build eligibility: a person is ineligible if they've already won ANY
-    # previous hand (person-type distribution only, not operator hands).
-    all_person_winner_ids = set()
-    for h in vc.hands:
-        for d in h.hand_distributions:
-            if not d.is_operator_taken and d.person_id is not None:
-                all_person_winner_ids.add(d.person_id)
-
-    # Build win history per member for this VC
+    # Win history per member for this VC, from one query over its payouts
+    winners = vc.winners_index()
     member_eligibility = {}
     for member in members:
         if member is None:
             continue
-        wins = [
-            d for h in vc.hands
-            for d in h.hand_distributions
-            if not d.is_operator_taken and d.person_id == member.id
-        ]
-        if wins:
+        wins = winners.get(member.id)
+        member_eligibility[member.id] = {
+            'is_eligible': True,  # always eligible now
             # e.g. "Hand 2 · ₹800"
-            win_labels = [f"Hand {d.vc_hand.hand_number} · ₹{d.amount:,.0f}" for d in wins]
-            member_eligibility[member.id] = {
-                'is_eligible': True,  # always eligible now
-                'win_info': ", ".join(win_labels)
-            }
-        else:
-            member_eligibility[member.id] = {
-                'is_eligible': True,
-                'win_info': None
-            }
+            'win_info': ", ".join(f"Hand {number} · ₹{amount:,.0f}" for number, amount in wins) if wins else None
+        }
     member_slots = {p.id: vc.get_slots(p.id) for p in vc.members}
 
     return render_template(
@@ -0,0 +1,144 @@
+"""Person search (the search box on the Persons page).
+
+On SQLite the text is matched through two FTS5 tables with the trigram
+tokenizer, which gives the same substring semantics as ILIKE '%q%' from
+an index:
+
+    person_fts  — persons.name, short_name, phone, phone2   (rowid = persons.id)
+    ledger_fts  — ledger_entries.narration                  (rowid = ledger_entries.id)
+
+Both are external-content tables kept in step by triggers, so bulk
+statements and ON DELETE CASCADE are covered too.  Terms shorter than
+three characters (below trigram size) and other databases fall back to
+ILIKE on the person columns and narrations.
+
+Amounts are never compared as strings: a numeric term matches opening
+balances, current balances and ledger debits/credits within half a unit
+of its last digit.
+"""
+import re
+from sqlalchemy import or_, select, union
+from app import db
+from app.models.person import Person
+from app.models.ledger import LedgerEntry
+from app.models.person_balance import PersonBalance
+
+MIN_FTS_LENGTH = 3
+
+SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS person_fts USING fts5("
+    "name, short_name, phone, phone2, content='persons', content_rowid='id', tokenize='trigram')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS ledger_fts USING fts5("
+    "narration, content='ledger_entries', content_rowid='id', tokenize='trigram')",
+
+    "CREATE TRIGGER IF NOT EXISTS persons_fts_ai AFTER INSERT ON persons BEGIN "
+    "INSERT INTO person_fts(rowid, name, short_name, phone, phone2) "
+    "VALUES (new.id, new.name, new.short_name, new.phone, new.phone2); END",
+    "CREATE TRIGGER IF NOT EXISTS persons_fts_ad AFTER DELETE ON persons BEGIN "
+    "INSERT INTO person_fts(person_fts, rowid, name, short_name, phone, phone2) "
+    "VALUES ('delete', old.id, old.name, old.short_name, old.phone, old.phone2); END",
+    "CREATE TRIGGER IF NOT EXISTS persons_fts_au AFTER UPDATE OF name, short_name, phone, phone2 ON persons BEGIN "
+    "INSERT INTO person_fts(person_fts, rowid, name, short_name, phone, phone2) "
+    "VALUES ('delete', old.id, old.name, old.short_name, old.phone, old.phone2); "
+    "INSERT INTO person_fts(rowid, name, short_name, phone, phone2) "
+    "VALUES (new.id, new.name, new.short_name, new.phone, new.phone2); END",
+
+    "CREATE TRIGGER IF NOT EXISTS ledger_fts_ai AFTER INSERT ON ledger_entries BEGIN "
+    "INSERT INTO ledger_fts(rowid, narration) VALUES (new.id, new.narration); END",
+    "CREATE TRIGGER IF NOT EXISTS ledger_fts_ad AFTER DELETE ON ledger_entries BEGIN "
+    "INSERT INTO ledger_fts(ledger_fts, rowid, narration) VALUES ('delete', old.id, old.narration); END",
+    "CREATE TRIGGER IF NOT EXISTS ledger_fts_au AFTER UPDATE OF narration ON ledger_entries BEGIN "
+    "INSERT INTO ledger_fts(ledger_fts, rowid, narration) VALUES ('delete', old.id, old.narration); "
+    "INSERT INTO ledger_fts(rowid, narration) VALUES (new.id, new.narration); END",
+]
+
+_fts_ready = set()
+
+
+def fts_available():
+    """True when the FTS5 search tables exist in the current (SQLite) database."""
+    bind = db.session.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return False
+    url = str(bind.url)
+    if url not in _fts_ready:
+        found = db.session.execute(db.text(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name IN ('person_fts', 'ledger_fts')"
+        )).scalar()
+        if found != 2:
+            return False
+        _fts_ready.add(url)
+    return True
+
+
+def rebuild_search_index():
+    """Create the FTS tables/triggers if missing and repopulate them."""
+    conn = db.session.connection()
+    for statement in SEARCH_DDL:
+        conn.exec_driver_sql(statement)
+    conn.exec_driver_sql("INSERT INTO person_fts(person_fts) VALUES ('rebuild')")
+    conn.exec_driver_sql("INSERT INTO ledger_fts(ledger_fts) VALUES ('rebuild')")
+
+
+def amount_range(text):
+    """(low, high) for a numeric search term like '1,500' or '₹250.5', else None."""
+    cleaned = text.replace(',', '').replace('₹', '').strip()
+    if not re.fullmatch(r'-?\d+(\.\d+)?', cleaned):
+        return None
+    decimals = len(cleaned.split('.')[1]) if '.' in cleaned else 0
+    value = float(cleaned)
+    half_step = 0.5 / (10 ** decimals)
+    return value - half_step, value + half_step
+
+
+def ledger_amount_matches(low, high):
+    """SELECT person_id of ledger rows with a debit or credit in [low, high]."""
+    return union(
+        select(LedgerEntry.person_id).where(LedgerEntry.debit.between(low, high)),
+        select(LedgerEntry.person_id).where(LedgerEntry.credit.between(low, high)),
+    )
+
+
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def person_search_filter(text):
+    """
+    WHERE clause on Person (joined to PersonBalance) for the search box
+    text: names, short names, phones, ledger narrations and amounts.
+    """
+    conditions = []
+
+    amount = amount_range(text)
+    if amount is not None:
+        low, high = amount
+        conditions += [
+            Person.opening_balance.between(low, high),
+            PersonBalance.current_balance.between(low, high),
+            Person.id.in_(ledger_amount_matches(low, high)),
+        ]
+
+    if len(text) >= MIN_FTS_LENGTH and fts_available():
+        phrase = _fts_phrase(text)
+        person_hits = db.text(
+            'SELECT rowid FROM person_fts WHERE person_fts MATCH :person_q'
+        ).bindparams(person_q=phrase).columns(db.column('rowid', db.Integer))
+        narration_hits = db.text(
+            'SELECT le.person_id FROM ledger_fts JOIN ledger_entries le ON le.id = ledger_fts.rowid '
+            'WHERE ledger_fts MATCH :ledger_q'
+        ).bindparams(ledger_q=phrase).columns(db.column('person_id', db.Integer))
+        conditions += [Person.id.in_(person_hits), Person.id.in_(narration_hits)]
+    else:
+        like = f'%{text}%'
+        conditions += [
+            Person.name.ilike(like),
+            Person.short_name.ilike(like),
+            Person.phone.ilike(like),
+            Person.phone2.ilike(like),
+            Person.id.in_(
+                select(LedgerEntry.person_id).where(LedgerEntry.narration.ilike(like))
+            ),
+        ]
+
+    return or_(*conditions)
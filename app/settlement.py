@@ -0,0 +1,296 @@
+"""Settlement engine — the postings for distributing one hand, computed in memory.
+
+SettlementEngine holds no session and runs no queries.  It takes the VC and
+hand (any objects with the attributes used below), the VC's slot map,
+starting balances and the operator, and returns a Settlement: plain dicts
+for every HandDistribution, Contribution and LedgerEntry row, in insert
+order, with running balances already applied.  The hand routes persist a
+settlement with one executemany per table, the preview endpoint returns it
+as JSON, and tests can run it on plain objects without a database.
+
+Postings (see routes/hand.py for the business rules):
+
+  person win, for each winner in order
+      winner          CREDIT payout (dated the hand)
+      operator person DEBIT payout      — every winner but the first
+      operator ledger DEBIT payout
+  operator keeps
+      distribution with is_operator_taken
+  then, both
+      every member    DEBIT (amount − interest) / total_slots × slots
+      operator ledger CREDIT interest charged
+
+Settlement.diff() compares a settlement with the rows a hand already has,
+so an edited payout only touches the rows that actually change.
+"""
+from app.models.enums import LedgerEntryKind
+
+# Ledger kinds a settlement posts.  Payments against the hand carry its
+# hand_id too (PAYMENT, PAYOUT_CASH) but are never settlement postings,
+# so they are left out of the rows a settlement is diffed against.
+SETTLEMENT_KINDS = (
+    LedgerEntryKind.PAYOUT_CREDIT,
+    LedgerEntryKind.HM_SETTLEMENT,
+    LedgerEntryKind.OPERATOR_INTEREST,
+    LedgerEntryKind.CONTRIBUTION,
+)
+
+# Diffing a settlement against posted rows: rows pair up by key, in id
+# order, and are rewritten only when a compared column differs.  Other
+# columns (ids, running balances, timestamps, a contribution's paid flag)
+# keep their posted values.
+DIFF_COLUMNS = {
+    'distributions':  (('person_id', 'is_operator_taken'), ('amount', 'narration', 'is_vc_money_taken')),
+    'contributions':  (('person_id',), ('amount',)),
+    'ledger_entries': (('person_id', 'entry_kind'), ('date', 'narration', 'credit', 'debit')),
+}
+
+
+class Settlement:
+    """Rows to insert for one hand, each a dict of model attributes."""
+
+    def __init__(self, now=None):
+        self.now = now
+        self.distributions = []
+        self.contributions = []
+        self.ledger_entries = []
+
+    @property
+    def person_ids(self):
+        """Persons whose ledgers this settlement posts to."""
+        return {row['person_id'] for row in self.ledger_entries if row['person_id'] is not None}
+
+    def diff(self, posted):
+        """
+        SettlementDiff turning `posted` (a Settlement of the hand's current
+        rows, each with its 'id') into this one.  Dates stamped with this
+        settlement's `now` are not compared, so re-running a payout keeps
+        the original posting times of rows it does not otherwise change.
+        """
+        result = SettlementDiff()
+        for table, (key_columns, compared) in DIFF_COLUMNS.items():
+            pending = {}
+            for row in getattr(posted, table):
+                pending.setdefault(tuple(row[c] for c in key_columns), []).append(row)
+
+            inserts, updates, deleted = [], [], []
+            for row in getattr(self, table):
+                candidates = pending.get(tuple(row[c] for c in key_columns))
+                if not candidates:
+                    inserts.append(row)
+                    continue
+                old = candidates.pop(0)
+                columns = [c for c in compared if not (c == 'date' and row[c] == self.now)]
+                if any(old[c] != row[c] for c in columns):
+                    updates.append((old, {**old, **{c: row[c] for c in columns}}))
+            for rows in pending.values():
+                deleted.extend(rows)
+
+            result.inserts[table] = inserts
+            result.updates[table] = updates
+            result.deletes[table] = deleted
+        return result
+
+    def to_dict(self):
+        def plain(row):
+            return {
+                key: (value.isoformat() if hasattr(value, 'isoformat') else
+                      value.name if isinstance(value, LedgerEntryKind) else value)
+                for key, value in row.items()
+            }
+        return {
+            'distributions': [plain(row) for row in self.distributions],
+            'contributions': [plain(row) for row in self.contributions],
+            'ledger_entries': [plain(row) for row in self.ledger_entries],
+            'total_payout': sum(row['amount'] for row in self.distributions),
+            'total_contributions': sum(row['amount'] for row in self.contributions),
+        }
+
+
+class SettlementDiff:
+    """
+    Row changes between two settlements, per table:
+      inserts — new rows
+      updates — (old row, new row) pairs; new rows keep the old 'id'
+      deletes — old rows with no counterpart
+    """
+
+    def __init__(self):
+        self.inserts = {}
+        self.updates = {}
+        self.deletes = {}
+
+    @property
+    def is_empty(self):
+        return not any(rows for changes in (self.inserts, self.updates, self.deletes)
+                       for rows in changes.values())
+
+    def changed_ledgers(self):
+        """
+        {person_id: earliest date} for every ledger whose amounts or
+        dates change (None is the VC's operator ledger).  Narration-only
+        updates do not move balances and are left out.
+        """
+        earliest = {}
+
+        def touch(row):
+            person_id = row['person_id']
+            if person_id not in earliest or row['date'] < earliest[person_id]:
+                earliest[person_id] = row['date']
+
+        for row in self.inserts.get('ledger_entries', ()):
+            touch(row)
+        for row in self.deletes.get('ledger_entries', ()):
+            touch(row)
+        for old, new in self.updates.get('ledger_entries', ()):
+            if any(old[c] != new[c] for c in ('date', 'credit', 'debit')):
+                touch(old)
+                touch(new)
+        return earliest
+
+
+class SettlementEngine:
+    """
+    vc               — id, name, amount
+    hand             — id, vc_id, hand_number, date
+    slot_map         — {person_id: slots} for the VC's members
+    balances         — {person_id: latest balance} for members, winners and the operator
+    operator_balance — latest balance of the VC's operator ledger (person_id NULL)
+    operator_id      — the user's OPERATOR person
+    now              — timestamp for distributions, contributions and operator rows
+    """
+
+    def __init__(self, vc, hand, slot_map, balances, operator_balance, operator_id, now):
+        self.vc = vc
+        self.hand = hand
+        self.slot_map = slot_map
+        self.balances = dict(balances)
+        self.operator_balance = operator_balance
+        self.operator_id = operator_id
+        self.now = now
+
+    # ── Entry points ─────────────────────────────────────────────────────────
+
+    def person_payout(self, winners, interest_charged, narration=''):
+        """winners: [(person_id, person_name, amount), ...] in form order."""
+        hand, vc = self.hand, self.vc
+        settlement = Settlement(self.now)
+
+        for i, (person_id, name, amount) in enumerate(winners):
+            settlement.distributions.append({
+                'hand_id': hand.id,
+                'person_id': person_id,
+                'amount': amount,
+                'narration': narration or f"{vc.name} Haath {hand.hand_number} mai aapko diye",
+                'payment_date': self.now,
+                'is_operator_taken': False,
+                'is_vc_money_taken': True,
+            })
+
+            # Credit winner
+            self._post_person(
+                settlement, person_id, hand.date, amount, 0,
+                f"{vc.name} Haath {hand.hand_number} aapki rahi hai",
+                LedgerEntryKind.PAYOUT_CREDIT
+            )
+
+            # HM debit — skip first winner
+            if i > 0:
+                net_amount = -amount
+                self._post_person(
+                    settlement, self.operator_id, self.now,
+                    net_amount if net_amount > 0 else 0,
+                    abs(net_amount) if net_amount < 0 else 0,
+                    f"{vc.name} Hand {hand.hand_number} mai {name} ko gaye",
+                    LedgerEntryKind.HM_SETTLEMENT
+                )
+
+            self._post_operator(
+                settlement, -amount,
+                f"Hand {hand.hand_number} — paid out to {name} ₹{amount:,.0f}",
+                LedgerEntryKind.HM_SETTLEMENT
+            )
+
+        self._post_contributions(settlement, interest_charged)
+        self._post_operator(
+            settlement, interest_charged,
+            f"Hand {hand.hand_number} — interest charged ₹{interest_charged:,.0f}",
+            LedgerEntryKind.OPERATOR_INTEREST
+        )
+        return settlement
+
+    def operator_keeps(self, bid_price, interest_charged, narration=''):
+        hand = self.hand
+        settlement = Settlement(self.now)
+
+        settlement.distributions.append({
+            'hand_id': hand.id,
+            'person_id': None,
+            'amount': bid_price,
+            'narration': narration or f"Operator kept Hand {hand.hand_number}",
+            'payment_date': self.now,
+            'is_operator_taken': True,
+            'is_vc_money_taken': True,
+        })
+
+        self._post_contributions(settlement, interest_charged)
+        self._post_operator(
+            settlement, interest_charged,
+            f"Hand {hand.hand_number} — operator kept (interest ₹{interest_charged:,.0f})",
+            LedgerEntryKind.OPERATOR_INTEREST
+        )
+        return settlement
+
+    # ── Postings ─────────────────────────────────────────────────────────────
+
+    def _post_contributions(self, settlement, interest_charged):
+        hand, vc = self.hand, self.vc
+        total_slots       = int(sum(slots or 0 for slots in self.slot_map.values()))
+        contribution_pool = float(vc.amount) - interest_charged
+        contrib_per_slot  = contribution_pool / total_slots if total_slots > 0 else 0
+
+        for person_id, slots in self.slot_map.items():
+            if not slots:
+                continue
+            member_contribution = contrib_per_slot * slots
+            settlement.contributions.append({
+                'hand_id': hand.id,
+                'person_id': person_id,
+                'amount': member_contribution,
+                'date': self.now,
+                'paid': False,
+            })
+            self._post_person(
+                settlement, person_id, hand.date, 0, member_contribution,
+                f"{vc.name} Haath {hand.hand_number} mai aapka hissa raha",
+                LedgerEntryKind.CONTRIBUTION
+            )
+
+    def _post_person(self, settlement, person_id, date, credit, debit, narration, kind):
+        balance = self.balances.get(person_id, 0.0) + credit - debit
+        self.balances[person_id] = balance
+        settlement.ledger_entries.append({
+            'person_id': person_id,
+            'vc_id': self.vc.id,
+            'hand_id': self.hand.id,
+            'date': date,
+            'narration': narration,
+            'credit': credit,
+            'debit': debit,
+            'balance': balance,
+            'entry_kind': kind,
+        })
+
+    def _post_operator(self, settlement, net_amount, narration, kind):
+        self.operator_balance += net_amount
+        settlement.ledger_entries.append({
+            'person_id': None,
+            'vc_id': self.vc.id,
+            'hand_id': self.hand.id,
+            'date': self.now,
+            'narration': narration,
+            'credit': net_amount if net_amount >= 0 else 0,
+            'debit': abs(net_amount) if net_amount < 0 else 0,
+            'balance': self.operator_balance,
+            'entry_kind': kind,
+        })
@@ -0,0 +1,134 @@
+"""Per-request SQL instrumentation.
+
+Every statement run while handling a request is counted and timed
+through the engine's before/after_cursor_execute events.  When the
+request finishes, the totals are added to the response headers
+
+    X-Query-Count: 7
+    Server-Timing: db;dur=4.21;desc="7 queries", app;dur=18.90
+
+(browser dev tools show Server-Timing in the network timings).  A JSON
+line also goes to the 'app.sql_metrics' logger with the endpoint, the
+query count, the DB and total time and the slowest statements, so N+1
+regressions show up per blueprint endpoint.  Requests over
+SQL_METRICS_WARN_QUERIES statements are logged as warnings.
+
+Config:
+    SQL_METRICS              on/off (default True)
+    SQL_METRICS_SLOWEST      statements kept per request (default 3)
+    SQL_METRICS_WARN_QUERIES warn above this many statements (default 50)
+"""
+import heapq
+import json
+import logging
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('app.sql_metrics')
+
+# Statements are trimmed to this many characters in the log
+STATEMENT_PREVIEW = 200
+
+
+class RequestSQLMetrics:
+    """Counters for one request."""
+
+    def __init__(self, slowest_kept):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_seconds = 0.0
+        self.slowest_kept = slowest_kept
+        self._slowest = []   # min-heap of (seconds, sequence, statement)
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.db_seconds += seconds
+        if self.slowest_kept <= 0:
+            return
+        item = (seconds, self.count, statement)
+        if len(self._slowest) < self.slowest_kept:
+            heapq.heappush(self._slowest, item)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    @property
+    def slowest(self):
+        """[(seconds, statement), ...], slowest first."""
+        return [(seconds, statement) for seconds, _, statement in sorted(self._slowest, reverse=True)]
+
+
+def _current_metrics():
+    if has_request_context():
+        return g.get('sql_metrics')
+    return None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, so a failed statement leaves nothing behind
+    if context is not None and _current_metrics() is not None:
+        context._sql_metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current_metrics()
+    started = getattr(context, '_sql_metrics_started', None)
+    if metrics is None or started is None:
+        return
+    metrics.record(statement, time.perf_counter() - started)
+
+
+def _begin_request():
+    if current_app.config['SQL_METRICS']:
+        g.sql_metrics = RequestSQLMetrics(current_app.config['SQL_METRICS_SLOWEST'])
+
+
+def _finish_request(response):
+    metrics = g.pop('sql_metrics', None)
+    if metrics is None:
+        return response
+
+    total_ms = (time.perf_counter() - metrics.started) * 1000
+    db_ms = metrics.db_seconds * 1000
+
+    response.headers['X-Query-Count'] = str(metrics.count)
+    response.headers['Server-Timing'] = (
+        f'db;dur={db_ms:.2f};desc="{metrics.count} queries", app;dur={total_ms:.2f}'
+    )
+
+    record = {
+        'endpoint': request.endpoint,
+        'blueprint': request.blueprint,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'queries': metrics.count,
+        'db_ms': round(db_ms, 2),
+        'total_ms': round(total_ms, 2),
+        'slowest': [
+            {'ms': round(seconds * 1000, 2), 'sql': ' '.join(statement.split())[:STATEMENT_PREVIEW]}
+            for seconds, statement in metrics.slowest
+        ],
+    }
+    level = logging.WARNING if metrics.count > current_app.config['SQL_METRICS_WARN_QUERIES'] else logging.INFO
+    logger.log(level, json.dumps(record))
+    return response
+
+
+def init_sql_metrics(app):
+    """Register the per-request hooks on an app."""
+    app.config.setdefault('SQL_METRICS', True)
+    app.config.setdefault('SQL_METRICS_SLOWEST', 3)
+    app.config.setdefault('SQL_METRICS_WARN_QUERIES', 50)
+
+    # Accessing app.logger attaches Flask's handler to the 'app' logger,
+    # which this one propagates to; log INFO unless configured otherwise
+    app.logger
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+
+    app.before_request(_begin_request)
+    app.after_request(_finish_request)
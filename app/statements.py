@@ -0,0 +1,140 @@
+"""Bulk statement generation: every person's ledger PDF for a period, in one ZIP.
+
+Statements are rendered by iter_statements() on a pool of warm worker
+processes.  Each worker builds the app (on the caller's database) and a
+WeasyPrint FontConfiguration once and reuses them for every statement it
+renders.  Finished PDFs come back in person order and go through
+stream_zip() as they arrive.  PDFs already in the export cache are reused
+as is.
+
+`flask export-statements` writes the ZIP chunks straight to its output
+file.  The web route never starts a pool itself: it queues a 'statements'
+export job, and `flask export-worker` runs the same pool from its job and
+writes the chunks into the export cache, which the browser downloads once
+the job is done.
+"""
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from flask import current_app
+from app import db
+from app.models.person import Person
+
+_worker_app = None
+_font_config = None
+
+
+def _worker_config():
+    """Config a pool worker needs to read the same database and export cache as its caller."""
+    return {
+        'SQLALCHEMY_DATABASE_URI': current_app.config['SQLALCHEMY_DATABASE_URI'],
+        'EXPORT_CACHE_DIR': current_app.config.get('EXPORT_CACHE_DIR'),
+    }
+
+
+def _init_statement_worker(app_config):
+    global _worker_app, _font_config
+    from weasyprint import HTML
+    from weasyprint.text.fonts import FontConfiguration
+    from app import create_app
+
+    _worker_app = create_app(test_config=app_config)
+    _font_config = FontConfiguration()
+    # Warm up font discovery so the first real statement does not pay for it
+    HTML(string='<p>warm-up</p>').write_pdf(font_config=_font_config)
+
+
+def _statement_filename(person):
+    name = re.sub(r'[^\w.-]+', '_', person.name).strip('_') or 'person'
+    return f'ledger_{name}_{person.id}.pdf'
+
+
+def _render_statement(person_id, from_date, to_date):
+    """Worker: (filename, pdf bytes) for one person."""
+    from weasyprint import HTML
+    from app.routes.ledger import render_statement_html
+    from app.export_cache import export_key, cached_export, store_export
+
+    with _worker_app.app_context():
+        try:
+            person = db.session.get(Person, person_id)
+            filename = _statement_filename(person)
+
+            key = export_key('pdf', person, {'vc_id': None, 'from_date': from_date, 'to_date': to_date})
+            path = cached_export(key, 'pdf')
+            if path is not None:
+                with open(path, 'rb') as fh:
+                    return filename, fh.read()
+
+            rendered_html = render_statement_html(person, None, from_date, to_date, now=datetime.now())
+            pdf_bytes = HTML(string=rendered_html).write_pdf(font_config=_font_config)
+            store_export(key, 'pdf', pdf_bytes)
+            return filename, pdf_bytes
+        finally:
+            db.session.remove()
+
+
+def iter_statements(person_ids, from_date=None, to_date=None, processes=None):
+    """Yield (filename, pdf bytes) for each person, in order, rendered in parallel."""
+    processes = processes or os.cpu_count() or 1
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(processes, max(len(person_ids), 1)),
+                             mp_context=context,
+                             initializer=_init_statement_worker,
+                             initargs=(_worker_config(),)) as pool:
+        count = len(person_ids)
+        yield from pool.map(
+            _render_statement, person_ids, [from_date] * count, [to_date] * count
+        )
+
+
+class _ChunkWriter:
+    """Write-only file object that hands back what was written since the last take()."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(files):
+    """Yield a ZIP archive of (filename, bytes) pairs chunk by chunk."""
+    writer = _ChunkWriter()
+    with zipfile.ZipFile(writer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for filename, data in files:
+            archive.writestr(filename, data)
+            yield writer.take()
+    yield writer.take()
+
+
+def statement_person_ids(user_id):
+    return [
+        pid for (pid,) in
+        db.session.query(Person.id).filter(Person.user_id == user_id).order_by(Person.name, Person.id)
+    ]
+
+
+def parse_period(period):
+    """'YYYY-MM-DD:YYYY-MM-DD' (either side may be empty) -> (from_date, to_date)."""
+    if not period:
+        return None, None
+    if ':' not in period:
+        raise ValueError('period must look like YYYY-MM-DD:YYYY-MM-DD')
+    from_date, to_date = (part.strip() or None for part in period.split(':', 1))
+    for value in (from_date, to_date):
+        if value:
+            datetime.strptime(value, '%Y-%m-%d')
+    return from_date, to_date
@@ -0,0 +1,117 @@
+"""Bulk VC onboarding from CSV (flask create-vcs-from-csv).
+
+One row per VC:
+
+    name,start_date,amount,tenure,min_interest,narration,members
+    Shop Group A,2025-01-01,100000,20,1000,,RK:2; PS; AM:3
+
+members lists the user's persons by short name, separated by ';', each
+with an optional ':slots' (default 1).  Every row is validated before
+anything is written.  VCs then get consecutive VC numbers, and all their
+memberships and hands go in with one executemany INSERT each — the same
+hand schedule as a VC created on the web form.
+"""
+import csv
+from datetime import datetime
+from app import db
+from app.models.person import Person
+from app.models.vc import VC, vc_members, create_hands_for, invalidate_slot_maps
+
+REQUIRED_COLUMNS = ('name', 'start_date', 'amount', 'tenure')
+
+
+def _parse_members(text):
+    """[(short_name, slots), ...] from 'RK:2; PS; AM:3'."""
+    members = []
+    for item in text.split(';'):
+        item = item.strip()
+        if not item:
+            continue
+        short_name, _, slots = item.partition(':')
+        slots = int(slots) if slots.strip() else 1
+        if slots < 1:
+            raise ValueError(f'slots must be at least 1 for {short_name.strip()}')
+        members.append((short_name.strip(), slots))
+    return members
+
+
+def parse_vc_csv(fh, user_id):
+    """
+    Read and validate a VC CSV for a user.  Returns a list of dicts with
+    the VC columns plus 'slots' ({person_id: slots}).  Raises ValueError
+    naming the first bad line.
+    """
+    reader = csv.DictReader(fh)
+    missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"missing column(s): {', '.join(missing)}")
+
+    person_ids = dict(
+        db.session.query(Person.short_name, Person.id)
+        .filter(Person.user_id == user_id)
+        .all()
+    )
+
+    specs = []
+    for line, row in enumerate(reader, start=2):
+        try:
+            name = (row['name'] or '').strip()
+            if not name:
+                raise ValueError('name is empty')
+            tenure = int(row['tenure'])
+            if tenure < 1:
+                raise ValueError('tenure must be at least 1')
+
+            slots = {}
+            for short_name, count in _parse_members(row.get('members') or ''):
+                if short_name not in person_ids:
+                    raise ValueError(f'no person with short name {short_name!r}')
+                slots[person_ids[short_name]] = slots.get(person_ids[short_name], 0) + count
+
+            specs.append({
+                'name': name,
+                'start_date': datetime.strptime(row['start_date'].strip(), '%Y-%m-%d'),
+                'amount': float(row['amount']),
+                'tenure': tenure,
+                'min_interest': float(row.get('min_interest') or 0),
+                'narration': (row.get('narration') or '').strip() or None,
+                'slots': slots,
+            })
+        except (ValueError, TypeError, AttributeError) as e:
+            raise ValueError(f'line {line}: {e}')
+    return specs
+
+
+def create_vcs(user_id, specs):
+    """
+    Create VCs from parse_vc_csv() output.  Returns the new VCs; the
+    caller commits.
+    """
+    last_number = db.session.query(db.func.max(VC.vc_number)).scalar() or 0
+
+    vcs = []
+    for number, spec in enumerate(specs, start=last_number + 1):
+        vcs.append(VC(
+            user_id      = user_id,
+            vc_number    = number,
+            name         = spec['name'],
+            start_date   = spec['start_date'],
+            amount       = spec['amount'],
+            min_interest = spec['min_interest'],
+            tenure       = spec['tenure'],
+            narration    = spec['narration'],
+        ))
+    db.session.add_all(vcs)
+    db.session.flush()
+
+    memberships = [
+        {'vc_id': vc.id, 'person_id': person_id, 'slots': slots}
+        for vc, spec in zip(vcs, specs)
+        for person_id, slots in spec['slots'].items()
+    ]
+    if memberships:
+        db.session.execute(vc_members.insert(), memberships)
+        invalidate_slot_maps(db.session)
+
+    create_hands_for(vcs)
+    return vcs
@@ -0,0 +1,33 @@
+"""Batch metrics for VC list pages.
+
+VC.total_due_per_vc lazy-loads every hand and contribution, so a list of
+N VCs cost O(N × hands) queries.  VCMetricsLoader loads the slot maps of
+the whole list in one query and the unpaid dues in one grouped query, and
+attaches the results to the VC objects, whose properties then use them.
+"""
+from app.models.vc import preload_slot_maps
+from app.dashboard_summary import unpaid_due_by_vc
+
+
+class VCMetricsLoader:
+    """Load total_slots and total_due_per_vc for many VCs at once."""
+
+    def __init__(self, vcs):
+        self.vcs = list(vcs)
+        self.total_slots = 0
+        self.total_due = 0.0
+
+    def load(self):
+        vc_ids = [vc.id for vc in self.vcs]
+        if vc_ids:
+            preload_slot_maps(vc_ids)
+        due_by_vc = unpaid_due_by_vc(vc_ids)
+
+        for vc in self.vcs:
+            vc._metrics = {
+                'total_slots': sum(slots or 0 for slots in vc.slot_map().values()),
+                'total_due': due_by_vc.get(vc.id, 0.0),
+            }
+        self.total_slots = sum(vc.total_slots for vc in self.vcs)
+        self.total_due = sum(due_by_vc.values())
+        return self
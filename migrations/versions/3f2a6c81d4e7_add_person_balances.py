@@ -0,0 +1,45 @@
+"""add person_balances
+
+Revision ID: 3f2a6c81d4e7
+Revises: 9b470282e01d
+Create Date: 2026-05-06 11:12:40.518233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a6c81d4e7'
+down_revision = '9b470282e01d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('person_balances',
+    sa.Column('person_id', sa.Integer(), nullable=False),
+    sa.Column('current_balance', sa.Float(), nullable=True),
+    sa.Column('last_entry_id', sa.Integer(), nullable=True),
+    sa.Column('entry_count', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['person_id'], ['persons.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('person_id')
+    )
+
+    # Backfill from the latest (highest id) ledger entry of each person
+    op.execute("""
+        INSERT INTO person_balances (person_id, current_balance, last_entry_id, entry_count, version)
+        SELECT s.person_id, le.balance, s.max_id, s.cnt, 1
+        FROM (
+            SELECT person_id, MAX(id) AS max_id, COUNT(id) AS cnt
+            FROM ledger_entries
+            WHERE person_id IS NOT NULL
+            GROUP BY person_id
+        ) s
+        JOIN ledger_entries le ON le.id = s.max_id
+    """)
+
+
+def downgrade():
+    op.drop_table('person_balances')
@@ -0,0 +1,84 @@
+"""add FTS5 person search index and ledger amount indexes
+
+Revision ID: a6d4e2b9c871
+Revises: f3a8b1c6d2e7
+Create Date: 2026-06-16 10:41:05.318804
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d4e2b9c871'
+down_revision = 'f3a8b1c6d2e7'
+branch_labels = None
+depends_on = None
+
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE person_fts USING fts5("
+    "name, short_name, phone, phone2, content='persons', content_rowid='id', tokenize='trigram')",
+    "CREATE VIRTUAL TABLE ledger_fts USING fts5("
+    "narration, content='ledger_entries', content_rowid='id', tokenize='trigram')",
+
+    "CREATE TRIGGER persons_fts_ai AFTER INSERT ON persons BEGIN "
+    "INSERT INTO person_fts(rowid, name, short_name, phone, phone2) "
+    "VALUES (new.id, new.name, new.short_name, new.phone, new.phone2); END",
+    "CREATE TRIGGER persons_fts_ad AFTER DELETE ON persons BEGIN "
+    "INSERT INTO person_fts(person_fts, rowid, name, short_name, phone, phone2) "
+    "VALUES ('delete', old.id, old.name, old.short_name, old.phone, old.phone2); END",
+    "CREATE TRIGGER persons_fts_au AFTER UPDATE OF name, short_name, phone, phone2 ON persons BEGIN "
+    "INSERT INTO person_fts(person_fts, rowid, name, short_name, phone, phone2) "
+    "VALUES ('delete', old.id, old.name, old.short_name, old.phone, old.phone2); "
+    "INSERT INTO person_fts(rowid, name, short_name, phone, phone2) "
+    "VALUES (new.id, new.name, new.short_name, new.phone, new.phone2); END",
+
+    "CREATE TRIGGER ledger_fts_ai AFTER INSERT ON ledger_entries BEGIN "
+    "INSERT INTO ledger_fts(rowid, narration) VALUES (new.id, new.narration); END",
+    "CREATE TRIGGER ledger_fts_ad AFTER DELETE ON ledger_entries BEGIN "
+    "INSERT INTO ledger_fts(ledger_fts, rowid, narration) VALUES ('delete', old.id, old.narration); END",
+    "CREATE TRIGGER ledger_fts_au AFTER UPDATE OF narration ON ledger_entries BEGIN "
+    "INSERT INTO ledger_fts(ledger_fts, rowid, narration) VALUES ('delete', old.id, old.narration); "
+    "INSERT INTO ledger_fts(rowid, narration) VALUES (new.id, new.narration); END",
+
+    "INSERT INTO person_fts(person_fts) VALUES ('rebuild')",
+    "INSERT INTO ledger_fts(ledger_fts) VALUES ('rebuild')",
+]
+
+FTS_TRIGGERS = (
+    'persons_fts_ai', 'persons_fts_ad', 'persons_fts_au',
+    'ledger_fts_ai', 'ledger_fts_ad', 'ledger_fts_au',
+)
+
+
+def _has_trigram_fts(bind):
+    # The trigram tokenizer needs SQLite >= 3.34; without it search uses ILIKE
+    try:
+        bind.exec_driver_sql("CREATE VIRTUAL TABLE temp._fts_probe USING fts5(x, tokenize='trigram')")
+    except sa.exc.DBAPIError:
+        return False
+    bind.exec_driver_sql('DROP TABLE temp._fts_probe')
+    return True
+
+
+def upgrade():
+    with op.batch_alter_table('ledger_entries', schema=None) as batch_op:
+        batch_op.create_index('ix_ledger_debit', ['debit'], unique=False)
+        batch_op.create_index('ix_ledger_credit', ['credit'], unique=False)
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite' and _has_trigram_fts(bind):
+        for statement in FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in FTS_TRIGGERS:
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS ledger_fts')
+        op.execute('DROP TABLE IF EXISTS person_fts')
+
+    with op.batch_alter_table('ledger_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_ledger_credit')
+        batch_op.drop_index('ix_ledger_debit')
@@ -0,0 +1,135 @@
+"""add entry_kind to ledger_entries
+
+Revision ID: b71d0c4e9a52
+Revises: 3f2a6c81d4e7
+Create Date: 2026-05-13 16:48:02.114907
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71d0c4e9a52'
+down_revision = '3f2a6c81d4e7'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+ENTRY_KINDS = (
+    'CONTRIBUTION', 'PAYOUT_CREDIT', 'PAYOUT_CASH', 'OPERATOR_INTEREST',
+    'HM_SETTLEMENT', 'MANUAL', 'TRANSACTION_MIRROR',
+)
+
+HAND_NUMBER = re.compile(r'\b(?:Haath|Hand) (\d+)')
+
+
+def _classify(row, mirrored):
+    """Map an existing ledger row to an entry kind from its narration."""
+    narration = row.narration or ''
+
+    if row.person_id is None:
+        # Operator rows: "Hand N — interest charged …" / "… operator kept (interest …)"
+        if 'interest' in narration:
+            return 'OPERATOR_INTEREST'
+        return 'HM_SETTLEMENT'
+
+    if narration.endswith('mai aapka hissa raha'):
+        return 'CONTRIBUTION'
+    if narration.endswith('aapki rahi hai'):
+        return 'PAYOUT_CREDIT'
+    if 'mai aapko diye' in narration:
+        return 'PAYOUT_CASH'
+    if ' mai ' in narration and narration.endswith(' ko gaye'):
+        return 'HM_SETTLEMENT'
+    if row.vc_id is None:
+        amount = (row.credit or 0) or (row.debit or 0)
+        if (row.person_id, narration, amount) in mirrored:
+            return 'TRANSACTION_MIRROR'
+        return 'MANUAL'
+    if ' Haath ' in narration and (row.credit or 0) > 0:
+        return 'CONTRIBUTION'
+    return 'MANUAL'
+
+
+def upgrade():
+    with op.batch_alter_table('ledger_entries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column(
+            'entry_kind',
+            sa.Enum(*ENTRY_KINDS, name='ledgerentrykind', native_enum=False),
+            nullable=True
+        ))
+        batch_op.create_index(
+            'ix_ledger_vc_hand_kind_person',
+            ['vc_id', 'hand_id', 'entry_kind', 'person_id'],
+            unique=False
+        )
+
+    # ── Backfill entry_kind (and hand_id where the narration names the hand) ──
+    bind = op.get_bind()
+    ledger = sa.table(
+        'ledger_entries',
+        sa.column('id'), sa.column('person_id'), sa.column('vc_id'),
+        sa.column('hand_id'), sa.column('narration'), sa.column('credit'),
+        sa.column('debit'), sa.column('entry_kind'),
+    )
+    hands = sa.table('vc_hands', sa.column('id'), sa.column('vc_id'), sa.column('hand_number'))
+    transactions = sa.table(
+        'transactions', sa.column('person_id'), sa.column('narration'), sa.column('amount')
+    )
+
+    hand_ids = {
+        (r.vc_id, r.hand_number): r.id
+        for r in bind.execute(sa.select(hands.c.id, hands.c.vc_id, hands.c.hand_number))
+    }
+
+    update = (
+        ledger.update()
+        .where(ledger.c.id == sa.bindparam('_id'))
+        .values(entry_kind=sa.bindparam('_kind'), hand_id=sa.bindparam('_hand_id'))
+    )
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(ledger)
+            .where(ledger.c.id > last_id)
+            .order_by(ledger.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        person_ids = {r.person_id for r in rows if r.person_id is not None and r.vc_id is None}
+        mirrored = set()
+        if person_ids:
+            mirrored = {
+                (t.person_id, t.narration or '', t.amount)
+                for t in bind.execute(
+                    sa.select(transactions).where(transactions.c.person_id.in_(person_ids))
+                )
+            }
+
+        params = []
+        for row in rows:
+            hand_id = row.hand_id
+            if hand_id is None and row.vc_id is not None:
+                match = HAND_NUMBER.search(row.narration or '')
+                if match:
+                    hand_id = hand_ids.get((row.vc_id, int(match.group(1))))
+            params.append({
+                '_id': row.id,
+                '_kind': _classify(row, mirrored),
+                '_hand_id': hand_id,
+            })
+        bind.execute(update, params)
+
+
+def downgrade():
+    with op.batch_alter_table('ledger_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_ledger_vc_hand_kind_person')
+        batch_op.drop_column('entry_kind')
@@ -0,0 +1,26 @@
+"""add transactions (user_id, date, id) index for the recent transactions page
+
+Revision ID: b9e1c7a4d350
+Revises: a6d4e2b9c871
+Create Date: 2026-06-19 16:02:44.127930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e1c7a4d350'
+down_revision = 'a6d4e2b9c871'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_user_date_id', ['user_id', 'date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_user_date_id')
@@ -0,0 +1,32 @@
+"""add ledger hot path indexes
+
+Revision ID: c4e19f7a2b30
+Revises: b71d0c4e9a52
+Create Date: 2026-05-20 10:03:55.671402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e19f7a2b30'
+down_revision = 'b71d0c4e9a52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ledger_entries', schema=None) as batch_op:
+        batch_op.create_index('ix_ledger_person_date_id', ['person_id', 'date', 'id'], unique=False)
+        batch_op.create_index('ix_ledger_person_id_id', ['person_id', 'id'], unique=False)
+        batch_op.create_index('ix_ledger_vc_person_date', ['vc_id', 'person_id', 'date'], unique=False)
+        batch_op.create_index('ix_ledger_hand_id', ['hand_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ledger_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_ledger_hand_id')
+        batch_op.drop_index('ix_ledger_vc_person_date')
+        batch_op.drop_index('ix_ledger_person_id_id')
+        batch_op.drop_index('ix_ledger_person_date_id')
@@ -0,0 +1,33 @@
+"""record contribution payments as PAYMENT ledger entries
+
+Revision ID: c8f4a1d7e2b6
+Revises: b9e1c7a4d350
+Create Date: 2026-10-17 11:20:05.318402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f4a1d7e2b6'
+down_revision = 'b9e1c7a4d350'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Payments against a hand were CONTRIBUTION credits; give them their
+    # own kind so hand settlements (CONTRIBUTION debits) never touch them.
+    # entry_kind is a non-native enum, so the new value needs no DDL.
+    op.execute(
+        "UPDATE ledger_entries SET entry_kind = 'PAYMENT' "
+        "WHERE entry_kind = 'CONTRIBUTION' AND credit > 0"
+    )
+
+
+def downgrade():
+    op.execute(
+        "UPDATE ledger_entries SET entry_kind = 'CONTRIBUTION' "
+        "WHERE entry_kind = 'PAYMENT'"
+    )
@@ -0,0 +1,26 @@
+"""add worker_id to export_jobs
+
+Revision ID: d2b7e9c4a815
+Revises: c8f4a1d7e2b6
+Create Date: 2026-10-17 12:04:51.662190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b7e9c4a815'
+down_revision = 'c8f4a1d7e2b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('worker_id', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.drop_column('worker_id')
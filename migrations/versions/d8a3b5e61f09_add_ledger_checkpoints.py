@@ -0,0 +1,40 @@
+"""add ledger_checkpoints
+
+Revision ID: d8a3b5e61f09
+Revises: c4e19f7a2b30
+Create Date: 2026-05-27 09:41:17.230554
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a3b5e61f09'
+down_revision = 'c4e19f7a2b30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by `flask build-checkpoints`; balance_as_of() works without them.
+    op.create_table('ledger_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('person_id', sa.Integer(), nullable=False),
+    sa.Column('vc_id', sa.Integer(), nullable=True),
+    sa.Column('checkpoint_date', sa.DateTime(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['person_id'], ['persons.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('person_id', 'vc_id', 'checkpoint_date', name='uq_checkpoint_person_vc_date')
+    )
+    with op.batch_alter_table('ledger_checkpoints', schema=None) as batch_op:
+        batch_op.create_index('ix_checkpoint_person_date', ['person_id', 'checkpoint_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ledger_checkpoints', schema=None) as batch_op:
+        batch_op.drop_index('ix_checkpoint_person_date')
+
+    op.drop_table('ledger_checkpoints')
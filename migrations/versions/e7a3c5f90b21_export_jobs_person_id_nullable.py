@@ -0,0 +1,27 @@
+"""allow export_jobs without a person (all-statements ZIP jobs)
+
+Revision ID: e7a3c5f90b21
+Revises: d2b7e9c4a815
+Create Date: 2026-10-17 12:41:17.204738
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3c5f90b21'
+down_revision = 'd2b7e9c4a815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.alter_column('person_id', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade():
+    op.execute("DELETE FROM export_jobs WHERE person_id IS NULL")
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.alter_column('person_id', existing_type=sa.Integer(), nullable=False)
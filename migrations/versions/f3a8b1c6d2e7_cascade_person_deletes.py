@@ -0,0 +1,57 @@
+"""cascade person deletes to ledger_entries and transactions
+
+Revision ID: f3a8b1c6d2e7
+Revises: e5c2d7f81a94
+Create Date: 2026-06-09 15:07:36.842210
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8b1c6d2e7'
+down_revision = 'e5c2d7f81a94'
+branch_labels = None
+depends_on = None
+
+TABLES = ('ledger_entries', 'transactions')
+
+# SQLite reflects the original foreign keys without a name; this gives
+# them one inside batch mode so they can be dropped.
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _person_fk_name(table):
+    for fk in sa.inspect(op.get_bind()).get_foreign_keys(table):
+        if fk['constrained_columns'] == ['person_id']:
+            return fk['name'] or f'fk_{table}_person_id_persons'
+    return None
+
+
+def _replace_person_fk(table, ondelete):
+    name = _person_fk_name(table)
+    with op.batch_alter_table(table, schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+        if name:
+            batch_op.drop_constraint(name, type_='foreignkey')
+        batch_op.create_foreign_key(
+            f'fk_{table}_person_id_persons', 'persons', ['person_id'], ['id'], ondelete=ondelete
+        )
+
+
+def upgrade():
+    # Rows of persons deleted before foreign keys were enforced would fail
+    # the copy into the rebuilt table; nothing can display them anyway.
+    for table in TABLES:
+        op.execute(
+            f'DELETE FROM {table} WHERE person_id IS NOT NULL '
+            f'AND person_id NOT IN (SELECT id FROM persons)'
+        )
+
+    for table in TABLES:
+        _replace_person_fk(table, 'CASCADE')
+
+
+def downgrade():
+    for table in TABLES:
+        _replace_person_fk(table, None)
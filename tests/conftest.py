@@ -0,0 +1,65 @@
+"""Shared fixtures: an app on a throwaway SQLite file, a logged-in client
+and a small VC (three members, four hands) with an OPERATOR person."""
+import json
+
+import pytest
+
+from app import create_app, db
+from app.models import User, Person, VC, VCHand
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(test_config={
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SQL_METRICS': False,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'EXPORT_CACHE_DIR': str(tmp_path / 'export_cache'),
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def user(app):
+    user = User(email='operator@example.com', name='Operator')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, user):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+    return client
+
+
+@pytest.fixture
+def vc(client, user):
+    """VC 'Alpha': ₹4,000 over 4 hands; P1 and P3 hold one slot, P2 two."""
+    persons = [
+        Person(user_id=user.id, name=f'P{i}', short_name=f'S{i}', opening_balance=100 * i)
+        for i in range(1, 4)
+    ]
+    db.session.add_all(persons + [Person(user_id=user.id, name='Operator', short_name='OPERATOR')])
+    db.session.commit()
+
+    slots = {persons[0].id: 1, persons[1].id: 2, persons[2].id: 1}
+    client.post('/vc/create', data={
+        'name': 'Alpha', 'start_date': '2025-01-01', 'amount': '4000',
+        'min_interest': '2', 'tenure': '4',
+        'members': [str(p.id) for p in persons],
+        'slot_data': json.dumps({str(k): v for k, v in slots.items()}),
+    })
+    return VC.query.filter_by(name='Alpha').one()
+
+
+def hand_of(vc, number):
+    return VCHand.query.filter_by(vc_id=vc.id, hand_number=number).one()
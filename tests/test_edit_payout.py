@@ -0,0 +1,95 @@
+"""edit_payout rewrites only the hand's settlement postings: payments
+recorded against the hand (contribution payments, cash payouts) and
+contributions' paid flags survive an edit."""
+from app import db
+from app.models import LedgerEntry, LedgerEntryKind, Contribution, Payment, Person
+from app.models.person_balance import PersonBalance
+from app.rebalance import rebalance_scope
+
+from conftest import hand_of
+
+
+def _distribute(client, vc, hand, winners):
+    client.post(f'/create/{hand.id}', data={
+        'payout_type': 'person',
+        'winners[]': [str(pid) for pid, _ in winners],
+        'amounts[]': [str(amount) for _, amount in winners],
+        'interest_charged': '150',
+    })
+
+
+def _edit(client, vc, hand, winners, interest='150'):
+    return client.post(f'/{vc.id}/hand/{hand.id}/edit-payout', data={
+        'payout_type': 'person',
+        'winners[]': [str(pid) for pid, _ in winners],
+        'amounts[]': [str(amount) for _, amount in winners],
+        'interest_charged': interest,
+    })
+
+
+def _record_contribution_payment(client, vc, hand, person):
+    return client.post(f'/payment/record?vc_id={vc.id}&hand_id={hand.id}', data={
+        'vc_id': vc.id, 'hand_id': hand.id, 'person_id': person.id,
+        'amount': '962.5', 'date': '2025-02-05T10:00', 'narration': 'paid',
+    })
+
+
+def _record_cash_payout(client, vc, hand, person):
+    return client.post('/payment/record-payout', data={
+        'vc_id': vc.id, 'hand_id': hand.id, 'person_id': person.id,
+        'amount': '1900', 'narration': '', 'date': '2025-02-06T10:00',
+    })
+
+
+def _payment_rows(hand):
+    return (
+        LedgerEntry.query
+        .filter(LedgerEntry.hand_id == hand.id)
+        .filter(LedgerEntry.entry_kind.in_([LedgerEntryKind.PAYMENT, LedgerEntryKind.PAYOUT_CASH]))
+        .order_by(LedgerEntry.id)
+        .all()
+    )
+
+
+def _assert_ledgers_consistent(vc):
+    # A full set-based rebalance must find nothing left to fix
+    assert rebalance_scope(vc_id=vc.id) == 0
+    for person in Person.query.all():
+        last = LedgerEntry.query.filter_by(person_id=person.id).order_by(LedgerEntry.id.desc()).first()
+        cached = db.session.get(PersonBalance, person.id)
+        if last is not None:
+            assert cached.current_balance == last.balance
+            assert cached.entry_count == LedgerEntry.query.filter_by(person_id=person.id).count()
+
+
+def test_recorded_payments_survive_edit_payout(client, vc):
+    p1, p2, p3 = sorted(vc.members, key=lambda p: p.id)
+    hand = hand_of(vc, 2)
+    _distribute(client, vc, hand, [(p2.id, 1900), (p3.id, 1900)])
+
+    _record_contribution_payment(client, vc, hand, p1)
+    _record_cash_payout(client, vc, hand, p2)
+    payments = [(e.id, e.person_id, e.entry_kind, e.credit, e.debit) for e in _payment_rows(hand)]
+    assert len(payments) == 2
+
+    # A no-op edit, then a real one, must leave both payments in place
+    assert _edit(client, vc, hand, [(p2.id, 1900), (p3.id, 1900)]).status_code == 302
+    assert _edit(client, vc, hand, [(p2.id, 1800), (p3.id, 2000)], interest='120').status_code == 302
+
+    db.session.expire_all()
+    assert [(e.id, e.person_id, e.entry_kind, e.credit, e.debit) for e in _payment_rows(hand)] == payments
+    assert Payment.query.filter_by(hand_id=hand.id).count() == 2
+    assert Contribution.query.filter_by(hand_id=hand.id, person_id=p1.id).one().paid is True
+    _assert_ledgers_consistent(vc)
+
+
+def test_noop_edit_writes_nothing(client, vc):
+    p1, p2, p3 = sorted(vc.members, key=lambda p: p.id)
+    hand = hand_of(vc, 1)
+    _distribute(client, vc, hand, [(p1.id, 3800)])
+    before = [(e.id, e.date, e.credit, e.debit, e.balance) for e in LedgerEntry.query.order_by(LedgerEntry.id)]
+
+    _edit(client, vc, hand, [(p1.id, 3800)])
+
+    db.session.expire_all()
+    assert [(e.id, e.date, e.credit, e.debit, e.balance) for e in LedgerEntry.query.order_by(LedgerEntry.id)] == before
@@ -0,0 +1,82 @@
+"""Export queue: stale-job requeueing and the queued all-statements ZIP."""
+import io
+import socket
+import subprocess
+import sys
+import zipfile
+from datetime import datetime, timedelta
+
+from app import db
+from app.export_jobs import claim_next_job, requeue_stale_jobs, run_job, worker_id
+from app.models import Person
+from app.models.export_job import ExportJob
+
+
+def _running_job(user, person, worker, started_minutes_ago):
+    job = ExportJob(
+        user_id=user.id, person_id=person.id, kind='pdf', status='running', progress=30,
+        worker_id=worker, started_at=datetime.utcnow() - timedelta(minutes=started_minutes_ago),
+    )
+    db.session.add(job)
+    return job
+
+
+def test_requeue_stale_jobs_leaves_live_workers_alone(user):
+    person = Person(user_id=user.id, name='P1', short_name='S1')
+    db.session.add(person)
+    db.session.flush()
+
+    exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+    exited.wait()
+    dead_worker = f'{socket.gethostname()}:{exited.pid}'
+
+    live = _running_job(user, person, worker_id(), 1)
+    remote = _running_job(user, person, 'other-host:4242', 1)
+    dead = _running_job(user, person, dead_worker, 1)
+    timed_out = _running_job(user, person, 'other-host:4242', 120)
+    db.session.commit()
+
+    assert requeue_stale_jobs(timeout=3600) == 2
+    db.session.expire_all()
+    assert [j.status for j in (live, remote, dead, timed_out)] == ['running', 'running', 'queued', 'queued']
+    assert dead.worker_id is None and dead.started_at is None
+
+    # A worker never requeues the jobs it is rendering itself
+    assert requeue_stale_jobs(timeout=0, worker=worker_id()) == 1
+    db.session.expire_all()
+    assert (live.status, remote.status) == ('running', 'queued')
+
+
+def test_statements_route_queues_a_job(client, vc, monkeypatch):
+    import app.statements
+    monkeypatch.setattr(app.statements, 'ProcessPoolExecutor', None)   # the web route must not start a pool
+
+    resp = client.post('/ledger/statements/export-jobs', json={'from_date': '2025-01-01'})
+    assert resp.status_code == 202
+    job = db.session.get(ExportJob, resp.get_json()['job_id'])
+    assert (job.kind, job.person_id, job.status) == ('statements', None, 'queued')
+
+    assert client.post('/ledger/statements/export-jobs', json={'from_date': 'soon'}).status_code == 400
+
+
+def test_statements_job_renders_one_zip(client, vc, monkeypatch):
+    import app.statements
+    pools = []
+    pool = app.statements.ProcessPoolExecutor
+    monkeypatch.setattr(app.statements, 'ProcessPoolExecutor',
+                        lambda *args, **kwargs: pools.append(kwargs) or pool(*args, **kwargs))
+
+    resp = client.post('/ledger/statements/export-jobs', json={})
+    job_id = resp.get_json()['job_id']
+
+    assert claim_next_job(worker_id()) == job_id
+    run_job(job_id)
+    assert len(pools) == 1   # rendered on the warm statement pool, not one by one
+    db.session.expire_all()
+    job = db.session.get(ExportJob, job_id)
+    assert (job.status, job.progress) == ('done', 100)
+
+    download = client.get(f'/ledger/export-jobs/{job_id}/download')
+    assert download.mimetype == 'application/zip'
+    names = zipfile.ZipFile(io.BytesIO(download.data)).namelist()
+    assert len(names) == Person.query.filter_by(user_id=job.user_id).count()
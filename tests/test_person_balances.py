@@ -0,0 +1,32 @@
+"""person_balances stays in step with ledger_entries through ORM flushes."""
+from datetime import datetime
+
+from app import db
+from app.models import LedgerEntry, Person
+from app.models.person_balance import PersonBalance
+
+
+def _entry(person, day, credit, balance):
+    return LedgerEntry(person_id=person.id, date=datetime(2025, 1, day), narration='n',
+                       credit=credit, debit=0, balance=balance)
+
+
+def test_moving_an_entry_resyncs_both_persons(user):
+    a = Person(user_id=user.id, name='A', short_name='A')
+    b = Person(user_id=user.id, name='B', short_name='B')
+    db.session.add_all([a, b])
+    db.session.flush()
+    first, moved = _entry(a, 1, 100, 100), _entry(a, 2, 50, 150)
+    db.session.add(_entry(b, 1, 10, 10))
+    db.session.flush()
+    db.session.add_all([first, moved])
+    db.session.commit()
+
+    moved.person_id = b.id
+    moved.balance = 60
+    db.session.commit()
+    db.session.expire_all()
+
+    rows = {row.person_id: row for row in PersonBalance.query}
+    assert (rows[a.id].entry_count, rows[a.id].last_entry_id, rows[a.id].current_balance) == (1, first.id, 100)
+    assert (rows[b.id].entry_count, rows[b.id].last_entry_id, rows[b.id].current_balance) == (2, moved.id, 60)
@@ -0,0 +1,33 @@
+"""The hot ledger queries, built by the routes' own helpers, seek through
+an index on a seeded database instead of scanning a whole table."""
+import pytest
+
+from app import db
+from app.models import LedgerEntry
+from app.query_plans import SAMPLE_PARAMS, check_query_plans
+
+from conftest import hand_of
+
+
+@pytest.fixture
+def seeded(client, vc, user):
+    """Two distributed hands, so every ledger, hand and operator table has rows."""
+    p1, p2, _ = sorted(vc.members, key=lambda p: p.id)
+    for number, winner in ((1, p1), (2, p2)):
+        hand = hand_of(vc, number)
+        client.post(f'/create/{hand.id}', data={
+            'payout_type': 'person',
+            'winners[]': [str(winner.id)],
+            'amounts[]': ['3800'],
+            'interest_charged': '150',
+        })
+    entry = LedgerEntry.query.filter_by(person_id=p1.id).order_by(LedgerEntry.id).first()
+    return dict(SAMPLE_PARAMS, person_id=p1.id, user_id=user.id, vc_id=vc.id,
+                hand_id=hand_of(vc, 1).id, id=entry.id, date=entry.date)
+
+
+def test_hot_queries_use_an_index(seeded):
+    results = check_query_plans(db.session.connection(), seeded)
+    assert len(results) == 13
+    scans = {name: lines for name, lines, full_scan in results if full_scan}
+    assert scans == {}
@@ -0,0 +1,52 @@
+"""rebalance_from: a whole-ledger rebalance goes through the set-based
+rebalance_window() and restores the same balances as a windowed one."""
+from sqlalchemy import update
+
+from app import db
+from app import rebalance
+from app.models import LedgerEntry
+from app.rebalance import rebalance_from
+
+from conftest import hand_of
+
+
+def _distribute(client, hand, winner):
+    client.post(f'/create/{hand.id}', data={
+        'payout_type': 'person',
+        'winners[]': [str(winner.id)],
+        'amounts[]': ['3800'],
+        'interest_charged': '150',
+    })
+
+
+def _balances():
+    return [(e.id, e.balance) for e in LedgerEntry.query.order_by(LedgerEntry.id)]
+
+
+def test_full_ledger_rebalance_uses_rebalance_window(client, vc, monkeypatch):
+    p1, p2, _ = sorted(vc.members, key=lambda p: p.id)
+    _distribute(client, hand_of(vc, 1), p1)
+    _distribute(client, hand_of(vc, 2), p2)
+    expected = _balances()
+
+    db.session.execute(update(LedgerEntry.__table__).values(balance=0))
+    db.session.expire_all()
+
+    calls = []
+    window = rebalance.rebalance_window
+    monkeypatch.setattr(rebalance, 'rebalance_window',
+                        lambda **scope: calls.append(scope) or window(**scope))
+
+    assert rebalance_from(p1.id) > 0
+    assert rebalance_from(None, vc_id=vc.id) > 0
+    assert calls == [
+        {'person_ids': [p1.id], 'operator_vc_ids': []},
+        {'person_ids': [], 'operator_vc_ids': [vc.id]},
+    ]
+
+    # Both ledgers are back to their posted balances
+    db.session.expire_all()
+    for entry_id, balance in expected:
+        entry = db.session.get(LedgerEntry, entry_id)
+        if entry.person_id == p1.id or (entry.person_id is None and entry.vc_id == vc.id):
+            assert entry.balance == balance